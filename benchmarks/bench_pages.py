@@ -0,0 +1,268 @@
+"""Page-level rerun benchmarks driven by Streamlit's AppTest harness.
+
+Usage:
+    python -m benchmarks.bench_pages [--repeat 5] [--output bench_results.json]
+
+Home.py and every page under pages/ are run headlessly against the replay
+Gemini stand-in (LLM_BACKEND=replay) with all databases and caches in a
+scratch directory. Each representative interaction is timed per rerun and the
+results are written as JSON, so two runs can be diffed to spot regressions in
+rerun cost.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOME_PAGE = os.path.join(ROOT, "Home.py")
+TUTORIAL_PAGE = os.path.join(ROOT, "pages", "English_Tutorial.py")
+QUIZ_PAGE = os.path.join(ROOT, "pages", "Grammar_Quiz.py")
+PROGRESS_PAGE = os.path.join(ROOT, "pages", "Progress_Tracking.py")
+GRAMMAR_ANALYSIS_PAGE = os.path.join(ROOT, "pages", "Voice_Interaction_&_Grammar_Analysis.py")
+CHATBOT_PAGE = os.path.join(ROOT, "pages", "Voice_Interaction_Chatbot.py")
+
+# Seeded quiz histories for the progress page
+HISTORY_SIZES = {"bench-10k": 10_000, "bench-100k": 100_000}
+GRAMMAR_MESSAGE = "Yesterday I goes to the market and buyed some apple for my family."
+
+
+def configure_environment(workdir, latency_ms):
+    """Point every store at the scratch directory and select the replay backend.
+
+    Must run before anything from utils is imported, since their settings are
+    read from the environment at import time.
+    """
+    os.environ.update({
+        "STREAMLIT_LOGGER_LEVEL": "error",
+        "LLM_BACKEND": "replay",
+        "REPLAY_LATENCY_MS": str(latency_ms),
+        "RESULTS_DB_PATH": os.path.join(workdir, "quiz_results.db"),
+        "RESULTS_CSV_PATH": os.path.join(workdir, "quiz_results.csv"),
+        "RESULTS_DIR": os.path.join(workdir, "learners"),
+        "QUIZ_BANK_PATH": os.path.join(workdir, "quiz_bank.db"),
+        "CONTENT_CACHE_PATH": os.path.join(workdir, "content_cache.db"),
+        "HISTORY_SNAPSHOT_DIR": os.path.join(workdir, "history"),
+        "TUTORIAL_BUNDLE_PATH": os.path.join(workdir, "tutorial_bundle.json"),
+    })
+
+
+def seed_history(learner_id, size, seed=0):
+    """Fill a learner's results partition with size synthetic quiz results"""
+    from utils.results_store import LearnerPartitions
+    from utils.tutorial_content import GRAMMAR_TOPICS
+
+    rng = random.Random(seed)
+    topics = [topic for category in GRAMMAR_TOPICS.values() for topic in category]
+    start = datetime.now() - timedelta(days=365)
+    step = timedelta(days=365) / size
+    results = [
+        (rng.choice(topics), rng.choice(["Easy", "Medium", "Hard"]),
+         rng.choice([0, 20, 40, 60, 80, 100]), start + step * i)
+        for i in range(size)
+    ]
+    LearnerPartitions().store_for(learner_id).record_results(results)
+
+
+def seed_histories():
+    for learner_id, size in HISTORY_SIZES.items():
+        started = time.perf_counter()
+        seed_history(learner_id, size)
+        print(f"Seeded {size} results for {learner_id} in {time.perf_counter() - started:.1f}s")
+
+
+def new_app(path, timeout, learner_id=None):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(path, default_timeout=timeout)
+    if learner_id is not None:
+        app.session_state["learner_id"] = learner_id
+    return app
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Recorder:
+    """Collects rerun timings per (page, interaction)"""
+
+    def __init__(self):
+        self.samples = {}
+
+    def time_run(self, page, interaction, app):
+        started = time.perf_counter()
+        app.run()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if app.exception:
+            raise RuntimeError(f"{page} / {interaction} raised: {app.exception[0].message}")
+        self.samples.setdefault((page, interaction), []).append(elapsed_ms)
+        return app
+
+    def results(self):
+        rows = []
+        for (page, interaction), samples in self.samples.items():
+            ordered = sorted(samples)
+            rows.append({
+                "page": page,
+                "interaction": interaction,
+                "runs": len(samples),
+                "min_ms": round(ordered[0], 2),
+                "median_ms": round(statistics.median(ordered), 2),
+                "mean_ms": round(statistics.fmean(ordered), 2),
+                "p95_ms": round(percentile(ordered, 0.95), 2),
+                "p99_ms": round(percentile(ordered, 0.99), 2),
+                "max_ms": round(ordered[-1], 2),
+                "samples_ms": [round(sample, 2) for sample in samples],
+            })
+        return rows
+
+
+def bench_home(recorder, timeout, run):
+    recorder.time_run("Home", "open", new_app(HOME_PAGE, timeout))
+
+
+def bench_tutorial(recorder, timeout, run):
+    from utils.tutorial_content import GRAMMAR_TOPICS
+
+    app = recorder.time_run("English_Tutorial", "open", new_app(TUTORIAL_PAGE, timeout))
+    # A topic nobody has viewed yet has to be generated; switching back to it is served from cache
+    topics = GRAMMAR_TOPICS[app.sidebar.selectbox[0].value]
+    topic = topics[run % len(topics)]
+    difficulty = ["Easy", "Medium", "Hard"][run // len(topics) % 3]
+    app.sidebar.selectbox[1].set_value(topic)
+    app.sidebar.selectbox[2].set_value(difficulty)
+    recorder.time_run("English_Tutorial", "select_new_topic", app)
+    recorder.time_run("English_Tutorial", "rerun_cached_topic", app)
+    app.button[0].click()
+    recorder.time_run("English_Tutorial", "practice_questions", app)
+    app.button[1].click()
+    recorder.time_run("English_Tutorial", "common_mistakes", app)
+
+
+def bench_quiz(recorder, timeout, run):
+    app = recorder.time_run("Grammar_Quiz", "open", new_app(QUIZ_PAGE, timeout, f"bench-quiz-{run}"))
+    app.sidebar.button[0].click()
+    recorder.time_run("Grammar_Quiz", "generate_quiz", app)
+
+    questions = app.session_state["current_quiz"]["questions"]
+    for i, question in enumerate(questions):
+        app.radio(key=f"q_{i}").set_value(list(question["options"].items())[-1])
+        recorder.time_run("Grammar_Quiz", "answer_question", app)
+
+    app.button[0].click()
+    recorder.time_run("Grammar_Quiz", "submit", app)
+    if not app.session_state["quiz_submitted"]:
+        raise RuntimeError("Grammar_Quiz / submit did not record the quiz")
+
+
+def bench_progress(recorder, timeout, run):
+    from utils.results_store import LearnerPartitions
+
+    for learner_id, size in HISTORY_SIZES.items():
+        page = f"Progress_Tracking[{size // 1000}k]"
+        app = recorder.time_run(page, "open", new_app(PROGRESS_PAGE, timeout, learner_id))
+        recorder.time_run(page, "rerun", app)
+
+        # A newly saved result invalidates the cached dashboard for this learner
+        LearnerPartitions().store_for(learner_id).record_result("Modal Auxiliaries", "Easy", 80.0)
+        recorder.time_run(page, "rerun_after_new_result", app)
+
+        app.checkbox(key="full_history").check()
+        recorder.time_run(page, "show_full_history", app)
+
+
+def bench_grammar_analysis(recorder, timeout, run):
+    page = "Voice_Interaction_&_Grammar_Analysis"
+    app = recorder.time_run(page, "open", new_app(GRAMMAR_ANALYSIS_PAGE, timeout))
+    app.sidebar.text_area(key="text_input").input(GRAMMAR_MESSAGE)
+    app.sidebar.button(key="submit").click()
+    recorder.time_run(page, "send_message", app)
+    if len(app.session_state["messages"]) != 2:
+        raise RuntimeError(f"{page} / send_message did not get an analysis")
+    recorder.time_run(page, "rerun_with_history", app)
+
+
+def bench_chatbot(recorder, timeout, run):
+    recorder.time_run("Voice_Interaction_Chatbot", "open", new_app(CHATBOT_PAGE, timeout))
+
+
+BENCHMARKS = {
+    "home": bench_home,
+    "tutorial": bench_tutorial,
+    "quiz": bench_quiz,
+    "progress": bench_progress,
+    "grammar_analysis": bench_grammar_analysis,
+    "chatbot": bench_chatbot,
+}
+
+
+def environment_info():
+    """Metadata identifying what a set of results was measured against"""
+    import streamlit
+
+    return {
+        "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time page reruns under Streamlit's AppTest harness")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each benchmark")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--latency-ms", type=float, default=0, help="injected model latency per call")
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout in seconds")
+    parser.add_argument("--workdir", help="scratch directory (default: a new temp directory)")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file to write")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench_pages_")
+    configure_environment(workdir, args.latency_ms)
+
+    selected = args.only or list(BENCHMARKS)
+    if "progress" in selected:
+        seed_histories()
+
+    recorder = Recorder()
+    for name in selected:
+        for run in range(args.repeat):
+            BENCHMARKS[name](recorder, args.timeout, run)
+        print(f"Finished {name}")
+
+    results = recorder.results()
+    report = {
+        **environment_info(),
+        "repeat": args.repeat,
+        "latency_ms": args.latency_ms,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"\n{'page':<40} {'interaction':<24} {'median ms':>10} {'p95 ms':>10}")
+    for row in results:
+        print(f"{row['page']:<40} {row['interaction']:<24} {row['median_ms']:>10.1f} {row['p95_ms']:>10.1f}")
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""Concurrent learner-session load generator.
+
+Usage:
+    python -m benchmarks.load_test --sessions 30 --duration 60 [--output load_results.json]
+
+Starts the app with `streamlit run` (replay Gemini stand-in, scratch
+databases) and connects N simulated learners to it over Streamlit's websocket
+protocol, the same way browser tabs do. Each session keeps walking through the
+scripted flows below. Every rerun is timed from sending the widget change
+until the server reports the script finished. The report gives throughput and
+p50/p95/p99 latency per interaction, plus the CPU and RSS of the server
+process.
+
+Use --url (and optionally --server-pid) to load a server that is already
+running instead.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+from benchmarks.bench_pages import (GRAMMAR_MESSAGE, HISTORY_SIZES, HOME_PAGE, configure_environment,
+                                    environment_info, percentile, seed_histories)
+
+FINISHED_EARLY_FOR_RERUN = ForwardMsg.ScriptFinishedStatus.FINISHED_EARLY_FOR_RERUN
+FINISHED_WITH_COMPILE_ERROR = ForwardMsg.ScriptFinishedStatus.FINISHED_WITH_COMPILE_ERROR
+
+
+class RerunFailed(Exception):
+    pass
+
+
+class BrowserSession:
+    """Minimal Streamlit client: reruns pages over the websocket and tracks widget ids like a browser tab"""
+
+    def __init__(self, url, learner_id, timeout):
+        self.url = url.rstrip("/").replace("http", "ws", 1) + "/_stcore/stream"
+        self.query_string = f"learner={learner_id}"
+        self.timeout = timeout
+        self.page = None
+        self.widgets = []
+        self.widget_states = {}
+        self._connection = None
+        self._message_cache = {}
+
+    async def connect(self):
+        self._connection = await websocket_connect(self.url, subprotocols=["streamlit"])
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+
+    async def open(self, page):
+        """Navigate to a page; widget values from the previous page are dropped"""
+        self.page = page
+        self.widget_states = {}
+        await self.rerun()
+
+    async def rerun(self, trigger=None):
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.page_name = self.page
+        client_state.query_string = self.query_string
+        client_state.widget_states.widgets.extend(self.widget_states.values())
+        if trigger is not None:
+            client_state.widget_states.widgets.add(id=trigger, trigger_value=True)
+        await self._connection.write_message(message.SerializeToString(), binary=True)
+        await asyncio.wait_for(self._read_until_finished(), self.timeout)
+
+    async def _read_until_finished(self):
+        widgets = []
+        error = None
+        while True:
+            raw = await self._connection.read_message()
+            if raw is None:
+                raise RerunFailed("server closed the connection")
+            message = ForwardMsg()
+            message.ParseFromString(raw)
+            if message.WhichOneof("type") == "ref_hash":
+                # Large messages this session has already received are sent by reference
+                message = self._message_cache[message.ref_hash]
+            elif message.metadata.cacheable:
+                self._message_cache[message.hash] = message
+            kind = message.WhichOneof("type")
+
+            if kind == "delta" and message.delta.WhichOneof("type") == "new_element":
+                element = message.delta.new_element
+                element_kind = element.WhichOneof("type")
+                if element_kind == "exception":
+                    error = element.exception.message
+                elif hasattr(getattr(element, element_kind), "id"):
+                    widgets.append((element_kind, getattr(element, element_kind)))
+            elif kind == "script_finished":
+                if message.script_finished == FINISHED_EARLY_FOR_RERUN:
+                    # st.rerun(): the server starts the next run by itself
+                    widgets, error = [], None
+                    continue
+                if message.script_finished == FINISHED_WITH_COMPILE_ERROR:
+                    error = "compile error"
+                break
+        self.widgets = widgets
+        if error:
+            raise RerunFailed(error)
+
+    def widget(self, kind, label):
+        for widget_kind, widget in self.widgets:
+            if widget_kind == kind and widget.label == label:
+                return widget
+        raise RerunFailed(f"no {kind} labelled {label!r} on {self.page}")
+
+    def set_value(self, widget, **value):
+        """Change a widget's value for the next rerun, e.g. set_value(radio, int_value=2)"""
+        self.widget_states[widget.id] = WidgetState(id=widget.id, **value)
+
+    async def click(self, label):
+        await self.rerun(trigger=self.widget("button", label).id)
+
+
+class LoadStats:
+    """Rerun latencies and failures per interaction"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.last_errors = {}
+
+    async def measure(self, interaction, rerun):
+        started = time.perf_counter()
+        try:
+            await rerun
+        except Exception as e:
+            self.errors[interaction] = self.errors.get(interaction, 0) + 1
+            self.last_errors[interaction] = f"{type(e).__name__}: {e}"
+            raise
+        self.samples.setdefault(interaction, []).append((time.perf_counter() - started) * 1000)
+
+    def results(self, elapsed):
+        rows = []
+        for interaction in sorted(set(self.samples) | set(self.errors)):
+            ordered = sorted(self.samples.get(interaction, []))
+            row = {
+                "interaction": interaction,
+                "runs": len(ordered),
+                "errors": self.errors.get(interaction, 0),
+                "throughput_per_s": round(len(ordered) / elapsed, 2),
+            }
+            if ordered:
+                row.update({
+                    "p50_ms": round(percentile(ordered, 0.50), 2),
+                    "p95_ms": round(percentile(ordered, 0.95), 2),
+                    "p99_ms": round(percentile(ordered, 0.99), 2),
+                    "max_ms": round(ordered[-1], 2),
+                })
+            rows.append(row)
+        return rows
+
+
+# Scripted flows; each interaction is one rerun
+async def tutorial_flow(session, stats, rng):
+    await stats.measure("tutorial.open", session.open("English_Tutorial"))
+    topics = session.widget("selectbox", "Select Topic")
+    session.set_value(topics, int_value=rng.randrange(len(topics.options)))
+    await stats.measure("tutorial.select_topic", session.rerun())
+    await stats.measure("tutorial.practice_questions", session.click("Generate Practice Questions"))
+
+
+async def quiz_flow(session, stats, rng):
+    await stats.measure("quiz.open", session.open("Grammar_Quiz"))
+    await stats.measure("quiz.generate", session.click("Generate New Quiz"))
+    for radio in [widget for kind, widget in session.widgets if kind == "radio"]:
+        session.set_value(radio, int_value=rng.randrange(len(radio.options)))
+        await stats.measure("quiz.answer", session.rerun())
+    await stats.measure("quiz.submit", session.click("Submit Quiz"))
+
+
+async def progress_flow(session, stats, rng):
+    await stats.measure("progress.open", session.open("Progress_Tracking"))
+    session.set_value(session.widget("checkbox", "Show full history"), bool_value=True)
+    await stats.measure("progress.full_history", session.rerun())
+
+
+async def grammar_analysis_flow(session, stats, rng):
+    page = "Voice_Interaction_&_Grammar_Analysis"
+    await stats.measure("grammar_analysis.open", session.open(page))
+    session.set_value(session.widget("text_area", "Type your message here..."), string_value=GRAMMAR_MESSAGE)
+    await stats.measure("grammar_analysis.send", session.click("Send Message"))
+
+
+FLOWS = {
+    "tutorial": tutorial_flow,
+    "quiz": quiz_flow,
+    "progress": progress_flow,
+    "grammar_analysis": grammar_analysis_flow,
+}
+
+
+async def run_session(number, args, stats, deadline):
+    """One learner: connect, then keep cycling through the flows until the deadline"""
+    rng = random.Random(number)
+    # Learners alternate between the seeded 10k and 100k result histories
+    learner_ids = list(HISTORY_SIZES)
+    session = BrowserSession(args.url, learner_ids[number % len(learner_ids)], args.timeout)
+    await session.connect()
+    try:
+        offset = number
+        while time.perf_counter() < deadline:
+            flow = args.flows[offset % len(args.flows)]
+            offset += 1
+            try:
+                await FLOWS[flow](session, stats, rng)
+            except Exception:
+                # Counted in stats; start the next flow from a fresh page load
+                pass
+            await asyncio.sleep(args.think_ms / 1000 * rng.uniform(0.5, 1.5))
+    finally:
+        session.close()
+
+
+class ProcessSampler:
+    """CPU and RSS of the server process, read from /proc"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.rss_samples = []
+        self.cpu_samples = []
+        self.ticks_per_second = os.sysconf("SC_CLK_TCK")
+
+    def cpu_seconds(self):
+        with open(f"/proc/{self.pid}/stat", encoding="ascii") as file:
+            fields = file.read().rsplit(")", 1)[1].split()
+        # utime and stime are the 14th and 15th fields of /proc/<pid>/stat
+        return (int(fields[11]) + int(fields[12])) / self.ticks_per_second
+
+    def rss_mb(self):
+        with open(f"/proc/{self.pid}/status", encoding="ascii") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+        return 0.0
+
+    async def run(self, interval):
+        last_wall, last_cpu = time.perf_counter(), self.cpu_seconds()
+        while True:
+            await asyncio.sleep(interval)
+            wall, cpu = time.perf_counter(), self.cpu_seconds()
+            self.cpu_samples.append((cpu - last_cpu) / (wall - last_wall) * 100)
+            self.rss_samples.append(self.rss_mb())
+            last_wall, last_cpu = wall, cpu
+
+
+def start_server(port):
+    """Run the app headless on port; settings are inherited from this process's environment"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", HOME_PAGE, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=1):
+                return server, url
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("streamlit server exited during startup")
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("streamlit server did not become healthy")
+
+
+async def generate_load(args, sampler):
+    stats = LoadStats()
+    sampler_task = asyncio.create_task(sampler.run(args.sample_interval)) if sampler else None
+    started = time.perf_counter()
+    deadline = started + args.ramp_up + args.duration
+    sessions = []
+    for number in range(args.sessions):
+        sessions.append(asyncio.create_task(run_session(number, args, stats, deadline)))
+        await asyncio.sleep(args.ramp_up / max(args.sessions, 1))
+    outcomes = await asyncio.gather(*sessions, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    if sampler_task:
+        sampler_task.cancel()
+    failed_sessions = [f"{type(e).__name__}: {e}" for e in outcomes if isinstance(e, Exception)]
+    return stats, elapsed, failed_sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent learner sessions against a Streamlit server")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent learner sessions")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of full load after ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds over which sessions connect")
+    parser.add_argument("--think-ms", type=float, default=1000, help="mean pause between flows")
+    parser.add_argument("--flows", nargs="+", choices=sorted(FLOWS), default=list(FLOWS),
+                        help="flows each session cycles through")
+    parser.add_argument("--latency-ms", type=float, default=0, help="injected model latency per call")
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout in seconds")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="seconds between CPU/RSS samples")
+    parser.add_argument("--port", type=int, default=8599, help="port for the server started by this tool")
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="pid of the --url server, for CPU/RSS sampling")
+    parser.add_argument("--workdir", help="scratch directory (default: a new temp directory)")
+    parser.add_argument("--output", default="load_results.json", help="JSON results file to write")
+    args = parser.parse_args()
+
+    server = None
+    server_pid = args.server_pid
+    if args.url is None:
+        configure_environment(args.workdir or tempfile.mkdtemp(prefix="load_test_"), args.latency_ms)
+        if "progress" in args.flows:
+            seed_histories()
+        server, args.url = start_server(args.port)
+        server_pid = server.pid
+
+    try:
+        sampler = ProcessSampler(server_pid) if server_pid and os.path.exists(f"/proc/{server_pid}") else None
+        rss_start = sampler.rss_mb() if sampler else None
+        cpu_start = sampler.cpu_seconds() if sampler else None
+        stats, elapsed, failed_sessions = asyncio.run(generate_load(args, sampler))
+        process = None
+        if sampler:
+            cpu_used = sampler.cpu_seconds() - cpu_start
+            process = {
+                "pid": server_pid,
+                "cpu_seconds": round(cpu_used, 2),
+                "cpu_percent_mean": round(cpu_used / elapsed * 100, 1),
+                "cpu_percent_peak": round(max(sampler.cpu_samples, default=0), 1),
+                "rss_mb_start": round(rss_start, 1),
+                "rss_mb_peak": round(max(sampler.rss_samples, default=rss_start), 1),
+                "rss_mb_end": round(sampler.rss_mb(), 1),
+            }
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    results = stats.results(elapsed)
+    total_runs = sum(row["runs"] for row in results)
+    report = {
+        **environment_info(),
+        "url": args.url,
+        "sessions": args.sessions,
+        "flows": args.flows,
+        "duration_s": round(elapsed, 2),
+        "think_ms": args.think_ms,
+        "latency_ms": args.latency_ms,
+        "reruns": total_runs,
+        "reruns_per_s": round(total_runs / elapsed, 2),
+        "errors": sum(row["errors"] for row in results),
+        "server_process": process,
+        "failed_sessions": failed_sessions,
+        "last_errors": stats.last_errors,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"{args.sessions} sessions over {elapsed:.1f}s: {total_runs} reruns "
+          f"({report['reruns_per_s']}/s), {report['errors']} errors")
+    if process:
+        print(f"server CPU {process['cpu_percent_mean']}% mean / {process['cpu_percent_peak']}% peak, "
+              f"RSS {process['rss_mb_start']} -> {process['rss_mb_peak']} MB peak")
+    print(f"\n{'interaction':<30} {'runs':>6} {'err':>5} {'req/s':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for row in results:
+        print(f"{row['interaction']:<30} {row['runs']:>6} {row['errors']:>5} {row['throughput_per_s']:>7.2f} "
+              f"{row.get('p50_ms', 0):>9.1f} {row.get('p95_ms', 0):>9.1f} {row.get('p99_ms', 0):>9.1f}")
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,120 +1,102 @@
 import streamlit as st
-import google.generativeai as genai
 import re
-from dotenv import load_dotenv
 import os
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Get the Gemini API key securely
-API_KEY = os.getenv("GEMINI_API_KEY")
-
-# Configure Gemini API securely
-genai.configure(api_key=API_KEY)
-
-# Initialize the model
-model = genai.GenerativeModel('gemini-1.5-flash')
-
-
-# Define grammar topics from your list
-GRAMMAR_TOPICS = {
-    "Basic Concepts": [
-        "Word definition criteria",
-        "Sentence: Definition & Types",
-        "Parts of Speech Overview"
-    ],
-    "Parts of Speech": [
-        "Noun: Definition & types",
-        "Pronoun: Definition & Types",
-        "Adjective: Definition & Types",
-        "Verb: Definition & Types",
-        "Adverb: Definition & Types",
-        "Preposition: definition & Types",
-        "Conjunction: Definition & Types",
-        "Interjection: Definition & Types",
-        "Article: Definition & Types"
-    ],
-    "Tenses": [
-        "Present Tense: Definition & Structure",
-        "Past Tense: Definition & Structure",
-        "Future Tense: Definition & Structure",
-        "Present Simple (Indefinite) Tense",
-        "Present Progressive (Continuous) Tense",
-        "Present Perfect Tense",
-        "Present Perfect Progressive Tense",
-        "Past Simple Tense",
-        "Past Progressive Tense",
-        "Past Perfect Tense",
-        "Future Simple Tense",
-        "Future Progressive Tense",
-        "Future Perfect Tense"
-    ],
-    "Advanced Grammar": [
-        "Clauses: Definition and Types",
-        "Conditionals: Definition and Types",
-        "Modal Auxiliaries",
-        "Subject Verb Agreement: Rules",
-        "Transformation of sentences",
-        "Punctuation: Definition, Types & Usage Rules"
-    ]
-}
-
-DIFFICULTY_DESCRIPTIONS = {
-    "Easy": "Basic concepts and simple examples suitable for beginners",
-    "Medium": "More detailed explanations with varied examples for intermediate learners",
-    "Hard": "Advanced concepts, complex examples, and detailed technical explanations"
-}
-
-
-def get_grammar_content(topic, difficulty):
+from utils.content_cache import ContentCache, make_cache_key
+from utils.debug_panel import metrics_sidebar
+from utils.llm import MODEL_NAME, generate_content, generate_text, iter_text
+from utils.metrics import record_cache_lookup
+from utils.tutorial_content import (BUNDLE_PATH, CONTENT_PROMPTS, DIFFICULTY_DESCRIPTIONS,
+                                    GRAMMAR_TOPICS, bundle_content,
+                                    explanation_prompt, load_bundle)
+
+# Render generated text chunk by chunk instead of waiting for the full response
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "1") != "0"
+
+
+@st.cache_resource
+def get_content_cache():
+    """Shared persistent cache for generated tutorial content"""
+    return ContentCache()
+
+
+@st.cache_resource(max_entries=2)
+def get_tutorial_bundle(path, modified_time):
+    """Pre-generated tutorial content, reloaded whenever the bundle file changes.
+
+    Shared rather than copied per call: the bundle is only ever read.
+    """
+    return load_bundle(path)
+
+
+def load_tutorial_bundle():
+    """Current content bundle (empty if the precompute job has not been run)"""
+    try:
+        modified_time = os.path.getmtime(BUNDLE_PATH)
+    except OSError:
+        modified_time = None
+    return get_tutorial_bundle(BUNDLE_PATH, modified_time)
+
+
+def stream_text(prompt, site, placeholder=None, render=None):
+    """Generate text with Gemini, streaming it into placeholder as chunks arrive"""
+    if not STREAM_RESPONSES or placeholder is None:
+        return generate_text(prompt, site=site)
+
+    text = ""
+    for chunk_text in iter_text(generate_content(prompt, stream=True, site=site)):
+        text += chunk_text
+        placeholder.markdown(f"<div class='generated-content'>{render(text)}</div>", unsafe_allow_html=True)
+    return text
+
+
+def format_explanation(text):
+    """Format the grammar explanation for display"""
+    text = text.replace("**", "<strong>").replace("**", "</strong>")
+    return text.replace("##", "<strong>").replace("**", "<strong>").replace("**", "</strong>")
+
+
+# Function to format content
+def format_content(text):
+    text = re.sub(r"\*\*(.*?)\*\*", r"<strong>\1</strong>", text)  # Bold text
+    text = text.replace("Easy:", "<h3>Easy</h3><div class='section'>")
+    text = text.replace("Medium:", "</div><h3>Medium</h3><div class='section'>")
+    text = text.replace("Hard:", "</div><h3>Hard</h3><div class='section'>")
+    return text + "</div>"
+
+
+def format_mistakes(text):
+    """Format the common mistakes table for display"""
+    text = text.replace("##", "<strong>").replace("**", "<strong>").replace("**", "</strong>")
+    return format_content(text)
+
+
+def get_grammar_content(topic, difficulty, placeholder=None):
     """Get grammar explanation from Gemini API based on difficulty level"""
-    difficulty_prompts = {
-        "Easy": f"""
-            Explain {topic} in simple terms for beginners.
-            Use basic vocabulary and simple examples.
-            
-            Include:
-            1. Simple Definition (3-4 sentences)
-            2. Basic Examples (3-4 easy examples)
-            3. Simple Practice Tips (3 tips)
-            4. Remember Points (3 key points)
-            
-            Keep it concise and beginner-friendly.
-        """,
-        "Medium": f"""
-            Provide a comprehensive explanation of {topic} for intermediate learners.
-            
-            Include:
-            1. Detailed Definition
-            2. Key Concepts (3-4 points)
-            3. Multiple Examples (4-5 varied examples)
-            4. Common Usage Patterns
-            5. Practice Tips (3-4 tips)
-            6. Common Mistakes to Avoid
-            
-            Use more detailed examples and explanations.
-        """,
-        "Hard": f"""
-            Provide an advanced, detailed analysis of {topic}.
-            
-            Include:
-            1. Comprehensive Technical Definition
-            2. Detailed Theoretical Background
-            3. Complex Concepts and Rules
-            4. Advanced Examples (including exceptions)
-            5. Technical Usage Notes
-            6. Common Errors in Advanced Usage
-            7. Expert Tips and Tricks
-            8. Related Advanced Topics
-            
-            Include complex cases and exceptions.
-        """
-    }
-    
-    response = model.generate_content(difficulty_prompts[difficulty])
-    content = response.text
-    content = content.replace("**", "<strong>").replace("**", "</strong>")
+    # Prefer the offline bundle, then the persistent cache, before calling Gemini
+    content = bundle_content(load_tutorial_bundle(), topic, difficulty, "explanation", MODEL_NAME)
+    layer = "bundle"
+    if content is None:
+        layer = "content_cache"
+        cache = get_content_cache()
+        prompt = explanation_prompt(topic, difficulty)
+        # Keyed by the prompt itself, so editing it regenerates the content just as it does for the bundle
+        cache_key = make_cache_key("tutorial", prompt, MODEL_NAME)
+        content = cache.get(cache_key)
+    # One lookup per explanation, counted against the last layer tried, so the hit rate matches the model calls
+    record_cache_lookup("tutorial", layer, content is not None)
+    if content is None:
+        content = stream_text(prompt, "tutorial", placeholder, format_explanation)
+        cache.set(cache_key, content)
+    return content
+
+
+def get_study_tool_content(topic, difficulty, kind, placeholder=None, render=None):
+    """Practice questions / common mistakes, from the bundle when available"""
+    content = bundle_content(load_tutorial_bundle(), topic, difficulty, kind, MODEL_NAME)
+    record_cache_lookup(kind, "bundle", content is not None)
+    if content is None:
+        content = stream_text(CONTENT_PROMPTS[kind](topic, difficulty), kind, placeholder, render)
     return content
 
 # Custom CSS
@@ -206,10 +188,10 @@ if selected_topic:
     st.markdown(f"**Difficulty Level:** {selected_difficulty}")
     
     # Show loading message
+    content_placeholder = st.empty()
     with st.spinner("Generating content..."):
-        content = get_grammar_content(selected_topic, selected_difficulty)
-        content = content.replace("##", "<strong>").replace("**", "<strong>").replace("**", "</strong>")
-        st.markdown(f"<div class='generated-content'>{content}</div>", unsafe_allow_html=True)
+        content = get_grammar_content(selected_topic, selected_difficulty, content_placeholder)
+        content_placeholder.markdown(f"<div class='generated-content'>{format_explanation(content)}</div>", unsafe_allow_html=True)
     
     # Additional features
     st.markdown("---")
@@ -243,48 +225,25 @@ if selected_topic:
     )
 
     col1, col2 = st.columns(2)
+    tool_placeholder = st.empty()
     content = ""
 
-    # Function to format content
-    def format_content(text):
-        text = re.sub(r"\*\*(.*?)\*\*", r"<strong>\1</strong>", text)  # Bold text
-        text = text.replace("Easy:", "<h3>Easy</h3><div class='section'>")
-        text = text.replace("Medium:", "</div><h3>Medium</h3><div class='section'>")
-        text = text.replace("Hard:", "</div><h3>Hard</h3><div class='section'>")
-        return text + "</div>"
-
     with col1:
         if st.button("Generate Practice Questions"):
             with st.spinner("Creating practice questions..."):
-                practice_prompt = f"""
-                Generate {selected_difficulty.lower()}-level practice questions about {selected_topic}.
-                Start with 
-                Easy: Create 2 simple questions
-                Medium: Create 2 moderate questions
-                Hard: Create 2 complex questions
-                Include answers and explanations.
-                """
-                practice_content = model.generate_content(practice_prompt).text
+                practice_content = get_study_tool_content(selected_topic, selected_difficulty, "practice",
+                                                          tool_placeholder, format_content)
                 content = format_content(practice_content)
 
     with col2:
         if st.button("Show Common Mistakes"):
             with st.spinner("Analyzing common mistakes..."):
-                mistakes_prompt = f"""
-                List common mistakes people make when using {selected_topic} at {selected_difficulty.lower()} level.
-                As a Table 
-                Include:
-                1. The mistake
-                2. Why it's wrong
-                3. The correct usage
-                Adjust complexity based on the difficulty level selected.
-                """
-                mistakes_content = model.generate_content(mistakes_prompt).text
-                mistakes_content = mistakes_content.replace("##", "<strong>").replace("**", "<strong>").replace("**", "</strong>")
-                content = format_content(mistakes_content)
+                mistakes_content = get_study_tool_content(selected_topic, selected_difficulty, "mistakes",
+                                                          tool_placeholder, format_mistakes)
+                content = format_mistakes(mistakes_content)
 
     if content:
-        st.markdown(f"<div class='generated-content'>{content}</div>", unsafe_allow_html=True)
+        tool_placeholder.markdown(f"<div class='generated-content'>{content}</div>", unsafe_allow_html=True)
 
 
 # Tips in sidebar
@@ -297,3 +256,5 @@ st.sidebar.markdown("""
 - Practice regularly with examples
 - Review common mistakes
 """)
+
+metrics_sidebar()
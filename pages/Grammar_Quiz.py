@@ -1,21 +1,10 @@
-import csv  # === CSV Addition ===
-import json
-from datetime import datetime  # === CSV Addition ===
-
-import google.generativeai as genai
 import streamlit as st
-from dotenv import load_dotenv
-import os
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Get the Gemini API key securely from .env or Render
-API_KEY = os.getenv("GEMINI_API_KEY")
 
-# Configure Gemini API securely
-genai.configure(api_key=API_KEY)
-model = genai.GenerativeModel('gemini-1.5-flash')
+from utils.debug_panel import metrics_sidebar
+from utils.learner import get_learner_partitions, learner_sidebar
+from utils.metrics import record_cache_lookup
+from utils.quiz import generate_questions, generate_questions_sharded, merge_questions
+from utils.quiz_bank import QuizBank
 
 
 # Initialize session state for quiz
@@ -65,47 +54,55 @@ DIFFICULTY_DESCRIPTIONS = {
     "Hard": "Complex questions testing advanced understanding"
 }
 
-def generate_quiz(topic, difficulty, num_questions=5):
-    """Generate quiz questions using Gemini API"""
-    prompt = f"""
-    Create a multiple choice quiz about {topic} with {num_questions} questions at {difficulty} difficulty level.
-    
-    Return the response in the following JSON format:
-    {{
-        "questions": [
-            {{
-                "question": "Question text here",
-                "options": {{
-                    "A": "First option",
-                    "B": "Second option",
-                    "C": "Third option",
-                    "D": "Fourth option"
-                }},
-                "correct_answer": "A",
-                "explanation": "Explanation of correct answer"
-            }}
-        ]
-    }}
-    
-    Make sure:
-    - Questions increase in complexity
-    - Only one correct answer per question
-    - Clear and concise explanations
-    - For {difficulty} difficulty level
-    - All related to {topic}
-    """
-    
-    response = model.generate_content(prompt)
-    try:
-        import re
-
-        # st.text(response.text)
-        clean_json = re.sub(r'```json\s*([\s\S]+?)\s*```', r'\1', response.text).strip()
-        # st.text(clean_json)
-        return json.loads(clean_json)
-    except:
-        st.error("Error generating quiz. Please try again.")
-        return None
+@st.cache_resource
+def get_quiz_bank():
+    """Shared question bank, refilled in the background as learners use it up"""
+    bank = QuizBank()
+    bank.start_refill_worker(generate_questions_sharded)
+    return bank
+
+
+def generate_quiz(topic, difficulty, num_questions=5, parallel=True):
+    """Serve quiz questions from the question bank, calling Gemini only when it runs dry"""
+    bank = get_quiz_bank()
+    learner_id = st.session_state.learner_id
+    questions = bank.draw(topic, difficulty, num_questions, learner_id)
+    record_cache_lookup("quiz", "quiz_bank", len(questions) == num_questions)
+
+    if len(questions) < num_questions:
+        # Preview each question as soon as it is generated, while the rest are still on the way
+        preview = st.empty()
+        preview_cards = preview.container()
+        shown = []
+
+        def show_question(question):
+            shown.append(question)
+            preview_cards.markdown(f"""
+            <div class="quiz-card">
+                <h4>Question {len(shown)}</h4>
+                {question['question']}
+            </div>
+            """, unsafe_allow_html=True)
+
+        for question in questions:
+            show_question(question)
+
+        generate = generate_questions_sharded if parallel else generate_questions
+        try:
+            fresh_questions = generate(topic, difficulty, num_questions - len(questions),
+                                       on_question=show_question)
+            questions = merge_questions(questions, fresh_questions, num_questions)
+            bank.add_questions(topic, difficulty, questions, seen_by=learner_id)
+        except Exception:
+            if not questions:
+                st.error("Error generating quiz. Please try again.")
+                return None
+        finally:
+            preview.empty()
+
+    # Top the bucket back up for the next quiz without blocking this one
+    bank.request_refill(topic, difficulty, learner_id)
+    return {"questions": questions}
 
 def calculate_score(quiz_data, user_answers):
     """Calculate quiz score"""
@@ -188,6 +185,7 @@ border-top-left-radius: 45px; border-bottom-right-radius: 45px; ">
 
 # Sidebar for quiz configuration
 st.sidebar.title("Quiz Settings")
+learner_id = learner_sidebar()
 
 selected_category = st.sidebar.selectbox("Select Category", list(GRAMMAR_TOPICS.keys()))
 selected_topic = st.sidebar.selectbox("Select Topic", GRAMMAR_TOPICS[selected_category])
@@ -203,46 +201,51 @@ selected_difficulty = st.sidebar.selectbox(
 
 # Number of questions selection
 num_questions = st.sidebar.slider("Number of Questions", min_value=3, max_value=10, value=5)
+parallel_generation = st.sidebar.checkbox(
+    "Fast generation",
+    value=True,
+    help="Split the quiz into several smaller requests that are generated in parallel"
+)
+
+# Apply background color to quiz questions (also used by the live preview)
+st.markdown("""
+<style>
+.quiz-card {
+    background-color: #343c42;
+    padding: 20px;
+    margin-bottom: 15px;
+    border-radius: 10px;
+    box-shadow: 0 4px 8px rgba(0, 0, 0, 0.2);
+}
+.grey-bg {
+    background-color: #343c42 !important;
+}
+.correct-answer {
+    color: #27ae60;
+    font-weight: bold;
+}
+.wrong-answer {
+    color: #e74c3c;
+    font-weight: bold;
+}
+.explanation {
+    margin-top: 10px;
+    font-size: 16px;
+    color: white;
+}
+</style>
+""", unsafe_allow_html=True)
 
 # Generate new quiz button with spinner
 if st.sidebar.button("Generate New Quiz"):
     with st.spinner("Generating quiz..."):
-        st.session_state.current_quiz = generate_quiz(selected_topic, selected_difficulty, num_questions)
+        st.session_state.current_quiz = generate_quiz(selected_topic, selected_difficulty, num_questions, parallel_generation)
     st.session_state.user_answers = {}
     st.session_state.quiz_submitted = False
     st.session_state.score = 0
 
 # Display quiz if available
 if st.session_state.current_quiz:
-    # Apply background color to quiz questions before submission
-    st.markdown("""
-    <style>
-    .quiz-card {
-        background-color: #343c42;
-        padding: 20px;
-        margin-bottom: 15px;
-        border-radius: 10px;
-        box-shadow: 0 4px 8px rgba(0, 0, 0, 0.2);
-    }
-    .grey-bg {
-        background-color: #343c42 !important;
-    }
-    .correct-answer {
-        color: #27ae60;
-        font-weight: bold;
-    }
-    .wrong-answer {
-        color: #e74c3c;
-        font-weight: bold;
-    }
-    .explanation {
-        margin-top: 10px;
-        font-size: 16px;
-        color: white;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
     if not st.session_state.quiz_submitted:
         st.markdown(f"### Quiz: {selected_topic} ({selected_difficulty})")
 
@@ -273,17 +276,13 @@ if st.session_state.current_quiz:
                 results = calculate_score(st.session_state.current_quiz, st.session_state.user_answers)
                 st.session_state.score = results
 
-                # === CSV Addition: Save to CSV on Submit ===
-                now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                csv_data = [now, selected_topic, selected_difficulty, f"{results['percentage']:.2f}%"]
-
+                # Save the result for the progress dashboard
                 try:
-                    with open("quiz_results.csv", mode='a', newline='') as file:
-                        writer = csv.writer(file)
-                        writer.writerow(csv_data)
+                    get_learner_partitions().store_for(learner_id).record_result(
+                        selected_topic, selected_difficulty, round(results['percentage'], 2)
+                    )
                 except Exception as e:
-                    st.error(f"Error saving to CSV: {e}")
-                # === CSV Addition End ===
+                    st.error(f"Error saving quiz result: {e}")
 
             else:
                 st.warning("Please answer all questions before submitting.")
@@ -336,7 +335,7 @@ if st.session_state.current_quiz:
                     if key in st.session_state:
                         del st.session_state[key]
 
-                st.session_state.current_quiz = generate_quiz(selected_topic, selected_difficulty, num_questions)
+                st.session_state.current_quiz = generate_quiz(selected_topic, selected_difficulty, num_questions, parallel_generation)
                 st.session_state.user_answers = {}
                 st.session_state.quiz_submitted = False
                 st.session_state.score = 0
@@ -351,3 +350,5 @@ st.sidebar.markdown("""
 - Try different difficulty levels
 - Practice regularly
 """)
+
+metrics_sidebar()
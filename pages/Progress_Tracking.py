@@ -1,8 +1,33 @@
 # progress_tracking.py
-import matplotlib.pyplot as plt
-import pandas as pd
+import os
+
 import streamlit as st
 
+from utils.charts import difficulty_chart, topic_score_chart, weekly_score_chart
+from utils.history_snapshot import SNAPSHOT_DIR, HistorySnapshot
+from utils.learner import get_learner_partitions, learner_sidebar
+from utils.results_store import partition_name
+
+
+@st.cache_resource(max_entries=64)
+def get_history_snapshot(learner_id):
+    """Columnar copy of a learner's quiz history, cached in-process per data version"""
+    store = get_learner_partitions().store_for(learner_id)
+    return HistorySnapshot(store, os.path.join(SNAPSHOT_DIR, partition_name(learner_id)))
+
+
+@st.cache_resource(max_entries=64)
+def build_dashboard(learner_id, data_version):
+    """Summary and chart specs for one version of a learner's data, reused until a new result is saved"""
+    store = get_learner_partitions().store_for(learner_id)
+    return {
+        "summary": store.summary(),
+        "weekly": weekly_score_chart(store.weekly_rollup()),
+        "topics": topic_score_chart(store.topic_rollup()),
+        "difficulties": difficulty_chart(store.difficulty_rollup()),
+    }
+
+
 # App title
 st.markdown('''
 <div style="text-align: center; margin-top:-30px; 
@@ -17,66 +42,46 @@ st.markdown("""
 ### 📚 Your Quiz Progress Overview
 """)
 
-# Load CSV data
-try:
-    df = pd.read_csv("quiz_results.csv", header=None)
-    df.columns = ["DateTime", "Topic", "Difficulty", "Score"]
-    df["DateTime"] = pd.to_datetime(df["DateTime"])  # Parse datetime
-    df["Score"] = df["Score"].str.replace('%', '').astype(float)
-except FileNotFoundError:
-    st.error("Quiz results file not found. Take some quizzes first!")
+learner_id = learner_sidebar()
+
+# Load this learner's pre-aggregated results (a handful of rows, however many quizzes were taken)
+partitions = get_learner_partitions()
+if not partitions.exists(learner_id):
+    st.error("No quiz results found. Take some quizzes first!")
+    st.stop()
+
+store = partitions.store_for(learner_id)
+dashboard = build_dashboard(learner_id, store.latest_id())
+summary = dashboard["summary"]
+if summary["total"] == 0:
+    st.error("No quiz results found. Take some quizzes first!")
     st.stop()
 
 # Raw Data Table
 with st.expander("Show Raw Quiz Submissions"):
-    st.dataframe(df)
+    if st.checkbox("Show full history", key="full_history"):
+        st.dataframe(get_history_snapshot(learner_id).load())
+    else:
+        st.dataframe(store.recent_results())
 
 
 # 1. Line Chart: Score Progress Over Week
 st.markdown("### 📅 Weekly Score Progress")
-
-# Extract week start date
-df["Week"] = df["DateTime"].dt.to_period("W").apply(lambda r: r.start_time)
-
-# Calculate average score per week
-avg_score_by_week = df.groupby("Week")["Score"].mean().reset_index()
-
-# Plot weekly average scores
-fig1, ax1 = plt.subplots()
-ax1.plot(avg_score_by_week["Week"], avg_score_by_week["Score"], marker='o', linestyle='-')
-ax1.set_xlabel("Week")
-ax1.set_ylabel("Average Score (%)")
-ax1.set_title("Average Score per Week")
-ax1.grid(True)
-plt.xticks(rotation=45)
-st.pyplot(fig1)
-
-
+st.altair_chart(dashboard["weekly"], use_container_width=True)
 
 # 2. Bar Chart: Average Score per Topic
 st.markdown("### 📚 Average Score per Topic")
-avg_score_topic = df.groupby("Topic")["Score"].mean().sort_values()
-fig2, ax2 = plt.subplots()
-ax2.barh(avg_score_topic.index, avg_score_topic.values)
-ax2.set_xlabel("Average Score (%)")
-ax2.set_ylabel("Topic")
-ax2.set_title("Average Score per Topic")
-ax2.grid(True)
-st.pyplot(fig2)
+st.altair_chart(dashboard["topics"], use_container_width=True)
 
 # 3. Pie Chart: Attempts per Difficulty Level
 st.markdown("### 🎯 Quiz Attempts by Difficulty")
-difficulty_counts = df["Difficulty"].value_counts()
-fig3, ax3 = plt.subplots()
-ax3.pie(difficulty_counts, labels=difficulty_counts.index, autopct='%1.1f%%', startangle=140)
-ax3.set_title("Quiz Attempts Distribution (Easy/Medium/Hard)")
-st.pyplot(fig3)
+st.altair_chart(dashboard["difficulties"], use_container_width=True)
 
 # 4. Extra: Summary Statistics
 st.markdown("### 📊 Quick Stats")
 col1, col2, col3 = st.columns(3)
-col1.metric("Total Quizzes", len(df))
-col2.metric("Average Score", f"{df['Score'].mean():.2f}%")
-col3.metric("Best Score", f"{df['Score'].max():.2f}%")
+col1.metric("Total Quizzes", summary["total"])
+col2.metric("Average Score", f"{summary['average']:.2f}%")
+col3.metric("Best Score", f"{summary['best']:.2f}%")
 
 st.success("Progress Tracking Loaded Successfully 🚀")
@@ -1,5 +1,4 @@
 import streamlit as st
-import google.generativeai as genai
 import speech_recognition as sr
 import os
 import time
@@ -7,17 +6,11 @@ import base64
 import tempfile
 import shutil
 import random
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Securely get the Gemini API key
-API_KEY = os.getenv("GEMINI_API_KEY")
-
-# Configure Gemini API securely
-genai.configure(api_key=API_KEY)
-model = genai.GenerativeModel('gemini-1.5-flash')
+from utils.debug_panel import metrics_sidebar
+from utils.llm import generate_content
+from utils.speech import transcribe
+from utils.transcript import grammar_analysis_html, reset_window, visible_messages
 
 
 # Initialize session state
@@ -113,7 +106,7 @@ def analyze_grammar(text):
 
     Text to analyze: "{text}"
     """
-    response = model.generate_content(prompt)
+    response = generate_content(prompt, site="grammar_analysis")
     return response.text
 
 # Custom CSS for Sidebar & Animation
@@ -193,6 +186,7 @@ st.markdown(f"<div class='custom-topic-container'><h3>🗣️Give Speech on Topi
 
 if st.button("New Topic"):
     st.session_state.messages = []
+    reset_window("grammar")
     generate_random_topic()
     st.rerun()
 
@@ -201,44 +195,38 @@ with st.sidebar:
     text_input = st.text_area("Type your message here...", height=100, key="text_input")
     submit_button = st.button("Send Message", key="submit")
     st.subheader("Voice Input")
-    record_button = st.button("🎤 Start Recording", key="record_button")
+    recording = st.audio_input("🎤 Record your speech", key="voice_input")
     if st.button("Clear Chat History", key="clear"):
         st.session_state.messages = []
+        reset_window("grammar")
         st.rerun()
 
-# Display messages
-for message in st.session_state.messages:
+# Display the most recent messages
+for message in visible_messages(st.session_state.messages, "grammar"):
     with st.chat_message(message["role"]):
         if message["role"] == "assistant":
-            content = message["content"].split("\n")
-            st.markdown(f"<div class='response-card'><h4>AI Response:</h4>", unsafe_allow_html=True)
-            for line in content:
-                if line.startswith("Grammar Analysis :") or line.startswith("Sentence Formation :") or line.startswith("Score :") or line.startswith("Suggestions :"):
-                    st.markdown(f"<div class='metric-heading'>{line}</div>", unsafe_allow_html=True)
-                else:
-                    st.markdown(f"<div class='metric-content'>{line}</div>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+            st.markdown(grammar_analysis_html(message["content"]), unsafe_allow_html=True)
         else:
             st.markdown(message["content"])
 
 # Audio Input Function
-def get_audio_input():
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        st.sidebar.markdown("<div class='listening-bar'></div>", unsafe_allow_html=True)
-        st.sidebar.write("Listening... Speak now!")
-        audio = r.listen(source)
-        try:
-            return r.recognize_google(audio)
-        except sr.UnknownValueError:
-            st.sidebar.error("Could not understand audio")
-            return None
-        except sr.RequestError:
-            st.sidebar.error("Could not request results")
-            return None
-
-if record_button:
-    user_input = get_audio_input()
+def get_audio_input(recording):
+    # Recordings come from the browser; each one is transcribed only once
+    if recording is None or st.session_state.get("last_recording_id") == recording.file_id:
+        return None
+    st.session_state.last_recording_id = recording.file_id
+    try:
+        with st.sidebar, st.spinner("Transcribing..."):
+            return transcribe(recording.getvalue()).text
+    except sr.UnknownValueError:
+        st.sidebar.error("Could not understand audio")
+        return None
+    except sr.RequestError:
+        st.sidebar.error("Could not request results")
+        return None
+
+if recording is not None:
+    user_input = get_audio_input(recording)
     if user_input:
         st.sidebar.success("Speech Recorded Successfully ✅")
         st.session_state.messages.append({"role": "user", "content": user_input})
@@ -253,6 +241,8 @@ if submit_button and text_input.strip():
         st.session_state.messages.append({"role": "assistant", "content": grammar_analysis})
         st.rerun()
 
+metrics_sidebar()
+
 import atexit
 
 # Cleanup Function
@@ -1,93 +1,75 @@
-import base64
 import os
-import shutil
-import tempfile
-import time
+import uuid
 
-import google.generativeai as genai
 import speech_recognition as sr
 import streamlit as st
-from dotenv import load_dotenv  # 👈 Add this to load .env
-from gtts import gTTS
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Get Gemini API key securely from environment
-API_KEY = os.getenv("GEMINI_API_KEY")
-
-# Configure Gemini API securely
-genai.configure(api_key=API_KEY)
-model = genai.GenerativeModel('gemini-1.5-flash')
+from utils.conversation import Conversation
+from utils.debug_panel import metrics_sidebar
+from utils.llm import generate_content, iter_text
+from utils.speech import transcribe
+from utils.transcript import chat_bubble_html, reset_window, visible_messages
+from utils.tts_cache import TTSCache
+from utils.tts_pipeline import SentenceSpeaker, audio_url, queue_audio
 
 
 # Initialize session state
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
-# Create a persistent directory for audio files
-if "audio_dir" not in st.session_state:
-    st.session_state.audio_dir = tempfile.mkdtemp()
-
-
-def autoplay_audio(file_path):
-    """Function to create an HTML audio player with autoplay"""
-    if not file_path or not os.path.exists(file_path):
-        return
-
-    with open(file_path, "rb") as f:
-        data = f.read()
-        b64 = base64.b64encode(data).decode()
-        md = f"""
-            <audio autoplay>
-                <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
-            </audio>
-            """
-        st.markdown(md, unsafe_allow_html=True)
-
-
-def get_audio_input():
-    """Function to capture audio input from user"""
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        st.sidebar.write("🎤 Listening... Speak now!")
-        progress_bar = st.sidebar.progress(0)
-        for i in range(100):
-            time.sleep(0.01)
-            progress_bar.progress(i + 1)
-        audio = r.listen(source)
-        try:
-            text = r.recognize_google(audio)
-            st.sidebar.success("Successfully recorded!")
-            return text
-        except sr.UnknownValueError:
-            st.sidebar.error("Could not understand audio")
-            return None
-        except sr.RequestError:
-            st.sidebar.error("Could not request results")
-            return None
+if "conversation" not in st.session_state:
+    st.session_state.conversation = Conversation()
 
 
-def get_conversation_response(text):
-    """Function to get conversational response from Gemini"""
-    prompt = f"""You are a friendly and helpful voice assistant. 
-    Respond to this message naturally and conversationally: {text}
-    Keep your response concise and friendly."""
-    response = model.generate_content(prompt)
-    return response.text
+@st.cache_resource
+def get_tts_cache():
+    """Synthesised replies shared by every session, so common phrases are only synthesised once"""
+    return TTSCache()
 
 
-def text_to_speech(text, filename=None):
-    """Function to convert text to speech"""
+def get_audio_input(recording):
+    """Function to transcribe a recording made in the browser (each recording only once)"""
+    if recording is None or st.session_state.get("last_recording_id") == recording.file_id:
+        return None
+    st.session_state.last_recording_id = recording.file_id
     try:
-        tts = gTTS(text=text, lang='en')
-        if filename is None:
-            filename = os.path.join(st.session_state.audio_dir, f"audio_{int(time.time())}.mp3")
-        tts.save(filename)
-        return filename
-    except Exception as e:
-        st.error(f"Error in text-to-speech conversion: {str(e)}")
+        with st.sidebar, st.spinner("Transcribing..."):
+            transcript = transcribe(recording.getvalue())
+        st.sidebar.success(f"Successfully recorded! (transcribed in {transcript.seconds:.1f}s)")
+        return transcript.text
+    except sr.UnknownValueError:
+        st.sidebar.error("Could not understand audio")
         return None
+    except sr.RequestError:
+        st.sidebar.error("Could not request results")
+        return None
+
+
+def get_conversation_response(text):
+    """Function to stream a conversational response from Gemini, speaking each sentence as soon as it is complete.
+
+    The prompt carries the earlier conversation within its token budget.
+    Returns the reply text and the audio clips it was spoken with.
+    """
+    conversation = st.session_state.conversation
+    prompt = conversation.prompt(text)
+    reply_id = uuid.uuid4().hex
+    reply_placeholder = st.empty()
+    speaker = SentenceSpeaker(get_tts_cache().synthesize)
+
+    reply = ""
+    for chunk_text in iter_text(generate_content(prompt, stream=True, site="conversation")):
+        reply += chunk_text
+        reply_placeholder.markdown(f"🤖 {reply}")
+        for path in speaker.feed(chunk_text):
+            queue_audio(reply_id, audio_url(path))
+    for path in speaker.finish():
+        queue_audio(reply_id, audio_url(path))
+
+    if speaker.failures:
+        st.error("Error in text-to-speech conversion: part of the reply could not be spoken")
+    conversation.add_turn(text, reply)
+    return reply, speaker.paths
 
 
 st.markdown("""
@@ -167,45 +149,42 @@ st.markdown("""
 
 with st.sidebar:
     st.header("Voice Controls")
-    record_button = st.button("🎤 Start Recording", key="record_button", help="Click to start voice recording")
+    recording = st.audio_input("🎤 Record a message", key="voice_input",
+                               help="Records in your browser; stop the recording to send it")
     st.markdown("---")
+    last_audio = st.session_state.messages[-1].get("audio") if st.session_state.messages else None
+    if last_audio:
+        # Registering the last reply's clips on every run keeps them served while they are still playing
+        clip_urls = [audio_url(path) for path in last_audio if os.path.exists(path)]
+        if st.button("🔁 Replay Last Reply", key="replay"):
+            replay_id = uuid.uuid4().hex
+            for url in clip_urls:
+                queue_audio(replay_id, url)
     if st.button("🗑️ Clear Chat History", key="clear"):
         st.session_state.messages = []
+        st.session_state.conversation = Conversation()
+        reset_window("chatbot")
         st.rerun()
 
 st.markdown("### Conversational AI")
 chat_container = st.container()
 
 with chat_container:
-    messages_html = ""
-    for message in st.session_state.messages:
-        messages_html += f"<div class='stChatMessage'>{message['content']}</div>"
+    messages = visible_messages(st.session_state.messages, "chatbot")
+    messages_html = "".join(chat_bubble_html(message["content"]) for message in messages)
     st.markdown(f"""
         <div class="chat-container">
             {messages_html}
         </div>
         """, unsafe_allow_html=True)
 
-if record_button:
-    user_input = get_audio_input()
+if recording is not None:
+    user_input = get_audio_input(recording)
     if user_input:
         st.session_state.messages.append({"role": "user", "content": f"🎤 You said: {user_input}"})
-        conversation_response = get_conversation_response(user_input)
-        audio_file = text_to_speech(conversation_response)
-        st.session_state.messages.append({"role": "assistant", "content": f"🤖 {conversation_response}", "audio": audio_file})
+        # The reply is spoken sentence by sentence while it streams in, so nothing is autoplayed after the rerun
+        conversation_response, audio_files = get_conversation_response(user_input)
+        st.session_state.messages.append({"role": "assistant", "content": f"🤖 {conversation_response}", "audio": audio_files})
         st.rerun()
 
-
-
-if len(st.session_state.messages) > 0 and "audio" in st.session_state.messages[-1] and st.session_state.messages[-1]["audio"]:
-    autoplay_audio(st.session_state.messages[-1]["audio"])
-
-
-import atexit
-
-
-def cleanup():
-    if hasattr(st.session_state, 'audio_dir') and os.path.exists(st.session_state.audio_dir):
-        shutil.rmtree(st.session_state.audio_dir)
-
-atexit.register(cleanup)
+metrics_sidebar()
@@ -0,0 +1,26 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def setting_from_dotenv(tmp_path):
+    """Value of a module setting when it is the first utils module imported next to the given .env"""
+    shutil.copytree(ROOT / "utils", tmp_path / "utils", ignore=shutil.ignore_patterns("__pycache__"))
+
+    def read(module, setting, dotenv):
+        (tmp_path / ".env").write_text("".join(f"{name}={value}\n" for name, value in dotenv.items()))
+        environment = {name: value for name, value in os.environ.items() if name not in dotenv}
+        result = subprocess.run(
+            [sys.executable, "-c", f"import {module}; print({module}.{setting})"],
+            cwd=tmp_path, env=environment, capture_output=True, text=True, check=True,
+        )
+        return result.stdout.strip()
+
+    return read
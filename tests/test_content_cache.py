@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import content_cache
+from utils.content_cache import ContentCache, make_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(content_cache, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def make_cache(tmp_path, **settings):
+    return ContentCache(str(tmp_path / "cache.db"), **settings)
+
+
+def test_settings_are_read_from_dotenv(setting_from_dotenv):
+    dotenv = {"CONTENT_CACHE_MAX_ENTRIES": "25"}
+    assert setting_from_dotenv("utils.content_cache", "CACHE_MAX_ENTRIES", dotenv) == "25"
+
+
+def test_cache_keys_depend_on_every_part():
+    assert make_cache_key("tutorial", "prompt", "model") == make_cache_key("tutorial", "prompt", "model")
+    assert make_cache_key("tutorial", "prompt", "model") != make_cache_key("tutorial", "prompt", "other model")
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=60)
+    cache.set("key", "value")
+    clock.value += 60
+    assert cache.get("key") == "value"
+    clock.value += 1
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=3, touch_interval=0)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+        clock.value += 1
+    assert cache.get("a") == "a"  # now more recently used than b and c
+    clock.value += 1
+    cache.set("d", "d")
+    assert [cache.get(key) for key in ("a", "b", "c", "d")] == ["a", None, "c", "d"]
+
+
+def test_recent_hits_do_not_refresh_the_access_time(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2, touch_interval=60)
+    cache.set("a", "a")
+    clock.value += 1
+    cache.set("b", "b")
+    clock.value += 1
+    # a was stored a second ago, so this hit does not move it ahead of b
+    assert cache.get("a") == "a"
+    cache.set("c", "c")
+    assert cache.get("a") is None and cache.get("b") == "b"
@@ -0,0 +1,82 @@
+from concurrent.futures import wait
+
+import pytest
+
+from utils import conversation
+from utils.conversation import Conversation
+from utils.llm import estimate_tokens
+
+
+@pytest.fixture
+def summaries(monkeypatch):
+    calls = []
+
+    def fake_summarize(summary, turns):
+        calls.append((summary, list(turns)))
+        return f"summary {len(calls)}"
+
+    monkeypatch.setattr(conversation, "summarize", fake_summarize)
+    return calls
+
+
+def wait_for_summary(chat):
+    if chat._pending_summary is not None:
+        wait([chat._pending_summary[0]], timeout=5)
+
+
+def talk(chat, turns, text="x" * 40):
+    for number in range(turns):
+        chat.prompt(f"{number} {text}")
+        chat.add_turn(f"{number} {text}", f"reply {number} {text}")
+        wait_for_summary(chat)
+
+
+def test_short_conversations_are_sent_verbatim(summaries):
+    chat = Conversation(token_budget=1000)
+    talk(chat, 2)
+    prompt = chat.prompt("next")
+    assert "Learner: 0" in prompt and "Assistant: reply 1" in prompt
+    assert "Summary" not in prompt
+    assert summaries == []
+
+
+def test_older_turns_are_folded_into_the_summary(summaries):
+    chat = Conversation(token_budget=100)
+    talk(chat, 6)
+    chat.prompt("next")  # applies the finished summary
+    assert summaries, "the history outgrew the budget but was never summarised"
+    first_summary, folded = summaries[0]
+    assert first_summary == "" and folded[0] == ("user", "0 " + "x" * 40)
+    # Folded turns are dropped; what is left fits half the budget at the time of folding
+    assert chat.summary.startswith("summary")
+    assert ("user", "0 " + "x" * 40) not in chat.turns
+
+
+def test_each_summary_builds_on_the_previous_one(summaries):
+    chat = Conversation(token_budget=100)
+    talk(chat, 12)
+    assert len(summaries) >= 2
+    assert summaries[1][0] == "summary 1"
+
+
+def failing_summarize(summary, turns):
+    raise RuntimeError("model unavailable")
+
+
+def test_prompt_history_stays_within_the_budget(monkeypatch):
+    # Summaries always fail, so only the sliding window bounds the prompt
+    monkeypatch.setattr(conversation, "summarize", failing_summarize)
+    chat = Conversation(token_budget=100)
+    talk(chat, 20)
+    history = chat.prompt("next").split("Most recent turns:\n")[1].split("\n\nRespond")[0]
+    assert sum(estimate_tokens(line.split(": ", 1)[1]) for line in history.splitlines()) <= 100
+    assert "19 " in history
+
+
+def test_failed_summaries_keep_the_turns(monkeypatch):
+    monkeypatch.setattr(conversation, "summarize", failing_summarize)
+    chat = Conversation(token_budget=100)
+    talk(chat, 6)
+    chat.prompt("next")
+    assert chat.summary == ""
+    assert len(chat.turns) == 12
@@ -0,0 +1,4 @@
+def test_exporter_settings_are_read_from_dotenv(setting_from_dotenv):
+    # The debug panel imports utils.metrics before anything else from utils
+    dotenv = {"METRICS_PORT": "9464"}
+    assert setting_from_dotenv("utils.metrics", "METRICS_PORT", dotenv) == "9464"
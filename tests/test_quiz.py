@@ -0,0 +1,137 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from utils import quiz
+from utils.quiz import QuestionStreamParser, merge_questions, parse_quiz, question_errors, repair_questions
+
+
+def make_question(number, **overrides):
+    question = {
+        "question": f"Question {number}?",
+        "options": {"A": "one", "B": "two", "C": "three", "D": "four"},
+        "correct_answer": "A",
+        "explanation": f"Explanation {number}",
+    }
+    question.update(overrides)
+    return question
+
+
+def quiz_json(*questions):
+    return json.dumps({"questions": list(questions)})
+
+
+def feed_in_chunks(text, size):
+    parser = QuestionStreamParser()
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start:start + size]))
+    return completed
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, 10000])
+def test_stream_parser_yields_each_question_whatever_the_chunking(size):
+    questions = [make_question(number) for number in range(3)]
+    assert feed_in_chunks(quiz_json(*questions), size) == questions
+
+
+def test_stream_parser_returns_a_question_as_soon_as_it_closes():
+    text = quiz_json(make_question(1), make_question(2))
+    first_end = text.index("}", text.index('"explanation"')) + 1
+    parser = QuestionStreamParser()
+    assert parser.feed(text[:first_end - 1]) == []
+    assert parser.feed(text[first_end - 1:first_end]) == [make_question(1)]
+
+
+def test_stream_parser_ignores_quotes_and_braces_inside_strings():
+    question = make_question(1, question='Which is right: "{a}" or \\"[b]\\"?',
+                             explanation='Braces } and brackets ] in text, and a backslash \\')
+    assert feed_in_chunks(quiz_json(question), 3) == [question]
+
+
+def test_stream_parser_skips_a_malformed_question_and_keeps_the_rest():
+    broken = '{"question": "Broken?" "options": {}}'
+    text = '{"questions": [' + json.dumps(make_question(1)) + ", " + broken + ", " + json.dumps(make_question(2)) + "]}"
+    assert feed_in_chunks(text, 5) == [make_question(1), make_question(2)]
+
+
+def test_parse_quiz_strips_markdown_fences():
+    assert parse_quiz("```json\n" + quiz_json(make_question(1)) + "\n```") == [make_question(1)]
+
+
+def test_parse_quiz_salvages_questions_from_invalid_json():
+    text = quiz_json(make_question(1), make_question(2))[:-2]  # truncated response
+    assert parse_quiz(text) == [make_question(1), make_question(2)]
+
+
+def test_parse_quiz_rejects_a_payload_without_questions():
+    with pytest.raises(ValueError):
+        parse_quiz('{"quiz": []}')
+    with pytest.raises(ValueError):
+        parse_quiz("not json at all")
+
+
+def test_question_errors_accepts_a_valid_question():
+    assert question_errors(make_question(1)) == []
+
+
+@pytest.mark.parametrize("question, error", [
+    ("not an object", "question is not an object"),
+    (make_question(1, question="  "), "missing question text"),
+    (make_question(1, options={"A": "a", "B": "b", "C": "c"}), "options must have exactly the keys A, B, C and D"),
+    (make_question(1, options={"A": "a", "B": "b", "C": "c", "D": ""}), "options must be non-empty strings"),
+    (make_question(1, correct_answer="E"), "correct_answer must be one of A, B, C or D"),
+    (make_question(1, explanation=None), "missing explanation"),
+])
+def test_question_errors_reports_each_problem(question, error):
+    assert error in question_errors(question)
+
+
+def test_repair_maps_candidates_to_broken_questions_by_position(monkeypatch):
+    broken = [(make_question(1, correct_answer="E"), ["bad answer"]),
+              (make_question(2, explanation=""), ["missing explanation"])]
+    responses = [
+        # First attempt fixes only the first question; the second candidate is missing
+        quiz_json(make_question(1)),
+        # Second attempt is sent just the question that is still broken
+        quiz_json(make_question(2)),
+    ]
+    prompts = []
+
+    def fake_generate_content(prompt, **kwargs):
+        prompts.append(prompt)
+        return SimpleNamespace(text=responses[len(prompts) - 1])
+
+    monkeypatch.setattr(quiz, "generate_content", fake_generate_content)
+    assert repair_questions("Nouns", "Easy", broken, attempts=2) == [make_question(1), make_question(2)]
+    assert "Question 2?" in prompts[0] and "Question 1?" not in prompts[1]
+
+
+def test_repair_drops_questions_still_invalid_after_the_budget(monkeypatch):
+    broken = [(make_question(1, correct_answer="E"), ["bad answer"])]
+    monkeypatch.setattr(quiz, "generate_content",
+                        lambda prompt, **kwargs: SimpleNamespace(text=quiz_json(make_question(1, correct_answer="Z"))))
+    assert repair_questions("Nouns", "Easy", broken, attempts=2) == []
+
+
+def test_merge_drops_near_duplicates_from_other_shards():
+    questions = [make_question(1, question="Which word is a noun in this sentence?")]
+    new_questions = [
+        make_question(2, question="Which word is a  NOUN in this sentence"),
+        make_question(3, question="Which word is a noun in this sentence?",
+                      options={"A": "run", "B": "blue", "C": "table", "D": "quickly"}),
+        make_question(4, question="Pick the verb."),
+        make_question(5, question="Pick the verb!"),
+    ]
+    merged = merge_questions(questions, new_questions, limit=10)
+    # The same stem with different options is kept; a reworded copy is not
+    assert [q["question"] for q in merged] == ["Which word is a noun in this sentence?",
+                                              "Which word is a noun in this sentence?", "Pick the verb."]
+
+
+def test_merge_stops_at_the_limit():
+    new_questions = [make_question(number, question=stem) for number, stem in
+                     enumerate(["Pick the verb.", "Which article fits?", "Where does the comma go?"])]
+    merged = merge_questions([make_question(1)], new_questions, limit=3)
+    assert merged == [make_question(1)] + new_questions[:2]
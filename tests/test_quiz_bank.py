@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from utils.quiz_bank import QuizBank
+
+
+def make_question(number, **overrides):
+    question = {
+        "question": f"Question {number}?",
+        "options": {"A": "one", "B": "two", "C": "three", "D": "four"},
+        "correct_answer": "A",
+        "explanation": f"Explanation {number}",
+    }
+    question.update(overrides)
+    return question
+
+
+@pytest.fixture
+def bank(tmp_path):
+    return QuizBank(str(tmp_path / "bank.db"), low_watermark=3, refill_batch_size=4)
+
+
+def test_duplicate_and_invalid_questions_are_not_stored(bank):
+    questions = [make_question(1), make_question(2), make_question(1, question="  QUESTION 1? "),
+                 make_question(3, correct_answer="E")]
+    assert bank.add_questions("Nouns", "Easy", questions) == 2
+    assert bank.add_questions("Nouns", "Easy", [make_question(2)]) == 0
+    # The same question may be stored for another difficulty
+    assert bank.add_questions("Nouns", "Hard", [make_question(2)]) == 1
+
+
+def test_draw_never_repeats_a_question_for_a_learner(bank):
+    bank.add_questions("Nouns", "Easy", [make_question(number) for number in range(5)])
+    first = bank.draw("Nouns", "Easy", 3, "ada")
+    second = bank.draw("Nouns", "Easy", 3, "ada")
+    assert len(first) == 3 and len(second) == 2
+    assert not {q["question"] for q in first} & {q["question"] for q in second}
+    assert bank.draw("Nouns", "Easy", 3, "ada") == []
+    # Other learners have not seen any of them
+    assert len(bank.draw("Nouns", "Easy", 5, "grace")) == 5
+
+
+def test_questions_added_for_a_learner_count_as_seen_by_them(bank):
+    bank.add_questions("Nouns", "Easy", [make_question(1), make_question(2)], seen_by="ada")
+    # Including a question that was already in the bank
+    bank.add_questions("Nouns", "Easy", [make_question(1), make_question(3)], seen_by="grace")
+    assert bank.unseen_count("Nouns", "Easy", "ada") == 1
+    assert bank.draw("Nouns", "Easy", 5, "grace") == [make_question(2)]
+
+
+def test_refills_are_requested_once_while_a_learner_runs_low(bank):
+    bank.add_questions("Nouns", "Easy", [make_question(number) for number in range(3)])
+    bank.request_refill("Nouns", "Easy", "ada")
+    assert bank._refill_queue.empty()
+
+    bank.draw("Nouns", "Easy", 1, "ada")
+    bank.request_refill("Nouns", "Easy", "ada")
+    bank.request_refill("Nouns", "Easy", "grace")
+    bank.request_refill("Nouns", "Easy", "ada")
+    assert bank._refill_queue.qsize() == 1
+
+
+def wait_for_refills(bank, timeout=5):
+    deadline = time.monotonic() + timeout
+    while bank._pending_refills and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_the_refill_worker_tops_up_the_bucket(bank):
+    bank.request_refill("Nouns", "Easy", "ada")
+    bank.start_refill_worker(lambda topic, difficulty, n: [make_question(number) for number in range(n)])
+    wait_for_refills(bank)
+    assert bank.unseen_count("Nouns", "Easy", "ada") == 4
+    # Once the refill is done the bucket can be queued again
+    bank.draw("Nouns", "Easy", 2, "ada")
+    bank.request_refill("Nouns", "Easy", "ada")
+    wait_for_refills(bank)
+    assert bank.unseen_count("Nouns", "Easy", "ada") == 2  # the regenerated questions are duplicates
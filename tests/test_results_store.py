@@ -0,0 +1,104 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from utils.results_store import WEEK_START_SQL, ResultsStore
+
+# 2024-06-02 is a Sunday, 2024-06-03 a Monday
+BOUNDARY_TIMES = [
+    datetime(2024, 6, 2, 0, 0, 0),
+    datetime(2024, 6, 2, 23, 59, 59),
+    datetime(2024, 6, 3, 0, 0, 0),
+    datetime(2024, 6, 3, 12, 30, 0),
+    datetime(2024, 6, 9, 23, 59, 59),
+    datetime(2024, 12, 31, 8, 0, 0),  # Tuesday of a week that spans the new year
+    datetime(2025, 1, 5, 8, 0, 0),  # Sunday closing that week
+]
+
+
+def pandas_week_start(times):
+    return pd.Series(pd.to_datetime(times)).dt.to_period("W").dt.start_time
+
+
+@pytest.mark.parametrize("taken_at", BOUNDARY_TIMES + [datetime(2024, 1, 1) + timedelta(days=day) for day in range(14)])
+def test_week_start_sql_matches_pandas_weeks(taken_at):
+    connection = sqlite3.connect(":memory:")
+    (week_start,) = connection.execute(f"SELECT {WEEK_START_SQL.format('?')}",
+                                       (taken_at.strftime("%Y-%m-%d %H:%M:%S"),)).fetchone()
+    assert pd.Timestamp(week_start) == pandas_week_start([taken_at])[0]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultsStore(str(tmp_path / "results.db"), legacy_csv_path=None)
+
+
+def test_weekly_rollup_splits_sunday_and_monday(store):
+    store.record_results([("Nouns", "Easy", 40, datetime(2024, 6, 2, 23, 59, 59)),
+                          ("Nouns", "Easy", 80, datetime(2024, 6, 3, 0, 0, 0)),
+                          ("Verbs", "Hard", 100, datetime(2024, 6, 9, 12, 0, 0))])
+    weekly = store.weekly_rollup()
+    assert list(weekly["Week"]) == [pd.Timestamp("2024-05-27"), pd.Timestamp("2024-06-03")]
+    assert list(weekly["Attempts"]) == [1, 2]
+    assert list(weekly["AverageScore"]) == [40, 90]
+
+
+def test_incremental_and_rebuilt_rollups_agree_with_pandas(store):
+    times = BOUNDARY_TIMES * 3
+    store.record_results([("Nouns", "Easy", index * 10 % 100, taken_at) for index, taken_at in enumerate(times)])
+    incremental = store.weekly_rollup()
+    store._rebuild_rollups()
+    rebuilt = store.weekly_rollup()
+    pd.testing.assert_frame_equal(incremental, rebuilt)
+
+    expected = store.load_results().assign(Week=lambda df: pandas_week_start(df["DateTime"]).values)
+    expected = expected.groupby("Week")["Score"].agg(["count", "mean"]).reset_index()
+    assert list(incremental["Week"]) == list(expected["Week"])
+    assert list(incremental["Attempts"]) == list(expected["count"])
+    assert list(incremental["AverageScore"]) == pytest.approx(list(expected["mean"]))
+
+
+def test_results_since_is_bounded(store):
+    store.record_results([("Nouns", "Easy", score, None) for score in (10, 20, 30)])
+    assert list(store.results_since(0, 2)["id"]) == [1, 2]
+    assert list(store.results_since(2, store.latest_id())["id"]) == [3]
+
+
+def test_snapshot_settings_are_read_from_dotenv(setting_from_dotenv):
+    dotenv = {"HISTORY_SNAPSHOT_MAX_PARTS": "4"}
+    assert setting_from_dotenv("utils.history_snapshot", "MAX_PARTS", dotenv) == "4"
+
+
+def test_locations_are_read_from_dotenv(setting_from_dotenv):
+    dotenv = {"RESULTS_DIR": "dotenv-learners"}
+    assert setting_from_dotenv("utils.results_store", "RESULTS_DIR", dotenv) == "dotenv-learners"
+
+
+def write_legacy_csv(path, rows):
+    path.write_text("".join(",".join(row) + "\n" for row in rows))
+    return str(path)
+
+
+def test_legacy_csv_is_imported_once(tmp_path):
+    csv_path = write_legacy_csv(tmp_path / "quiz_results.csv", [
+        ("2024-06-03 10:00:00", "Nouns", "Easy", "80.0%"),
+        ("2024-06-04 10:00:00", "Verbs", "Hard", " 40"),
+        ("2024-06-04 11:00:00", "Verbs", "Hard", "not a score"),
+        ("2024-06-04 12:00:00", "too", "few"),
+    ])
+    store = ResultsStore(str(tmp_path / "results.db"), legacy_csv_path=csv_path)
+    assert store.summary()["total"] == 2
+    # Neither a second import nor reopening the database adds the rows again
+    assert store.import_csv(csv_path) == 0
+    reopened = ResultsStore(str(tmp_path / "results.db"), legacy_csv_path=csv_path)
+    assert reopened.summary()["total"] == 2
+
+
+def test_results_recorded_before_the_csv_appears_do_not_block_its_import(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"), legacy_csv_path=str(tmp_path / "missing.csv"))
+    store.record_result("Nouns", "Easy", 100.0)
+    csv_path = write_legacy_csv(tmp_path / "missing.csv", [("2024-06-03 10:00:00", "Nouns", "Easy", "50")])
+    assert store.import_csv(csv_path) == 1
+    assert store.import_csv(csv_path) == 0
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from utils import tts_cache
+from utils.tts_cache import TTSCache
+
+
+class FakeGTTS:
+    """Writes a 100 byte clip instead of calling Google"""
+
+    calls = []
+
+    def __init__(self, text, lang, tld, slow):
+        self.text = text
+
+    def save(self, path):
+        FakeGTTS.calls.append(self.text)
+        with open(path, "wb") as file:
+            file.write(b"x" * 100)
+
+
+@pytest.fixture(autouse=True)
+def fake_gtts(monkeypatch):
+    FakeGTTS.calls = []
+    monkeypatch.setattr(tts_cache, "gTTS", FakeGTTS)
+    return FakeGTTS.calls
+
+
+def played_at(path, seconds):
+    os.utime(path, (seconds, seconds))
+
+
+def test_clips_are_synthesised_once(tmp_path, fake_gtts):
+    cache = TTSCache(str(tmp_path), max_bytes=0)
+    assert cache.synthesize("Hello") == cache.synthesize("Hello")
+    assert cache.synthesize("Hello", slow=True) != cache.path_for("Hello")
+    assert fake_gtts == ["Hello", "Hello"]
+    assert [name for name in os.listdir(tmp_path) if not name.endswith(".mp3")] == []
+
+
+def test_least_recently_played_clips_are_evicted(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=250)
+    first, second = cache.synthesize("one"), cache.synthesize("two")
+    played_at(first, 2000)
+    played_at(second, 1000)
+    third = cache.synthesize("three")
+    assert [os.path.exists(path) for path in (first, second, third)] == [True, False, True]
+    assert cache._size == 200
+
+
+def test_eviction_keeps_the_new_clip_and_counts_files_from_other_processes(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=250)
+    # Another worker process added clips the running total does not know about
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.mp3").write_bytes(b"x" * 100)
+        played_at(tmp_path / f"{name}.mp3", 1000)
+    clip = cache.synthesize("new")
+    played_at(clip, 0)  # even if its clock is behind the others
+    cache._evict(keep=clip)
+    assert os.path.exists(clip)
+    assert len(os.listdir(tmp_path)) == 2 and cache._size == 200
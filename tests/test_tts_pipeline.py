@@ -0,0 +1,54 @@
+import threading
+
+from utils.tts_pipeline import SentenceSpeaker, split_sentences
+
+
+def test_split_sentences_keeps_the_unfinished_remainder():
+    sentences, remainder = split_sentences("Dogs are great pets. They are loyal and", min_chars=5)
+    assert sentences == ["Dogs are great pets."]
+    assert remainder == "They are loyal and"
+
+
+def test_split_sentences_merges_short_openers_into_the_next_sentence():
+    sentences, remainder = split_sentences("Sure! I would love to talk about that. Next", min_chars=20)
+    assert sentences == ["Sure! I would love to talk about that."]
+    assert remainder == "Next"
+
+
+def test_split_sentences_handles_closing_quotes_and_brackets():
+    sentences, _ = split_sentences('He said "Hello there!" Then he left (quietly.) Bye', min_chars=5)
+    assert sentences == ['He said "Hello there!"', "Then he left (quietly.)"]
+
+
+def test_split_sentences_needs_whitespace_after_the_punctuation():
+    # A sentence is only complete once the next one starts, and decimals are not sentence ends
+    assert split_sentences("It costs 3.50 dollars.", min_chars=5) == ([], "It costs 3.50 dollars.")
+
+
+def test_speaker_yields_clips_in_reply_order():
+    first_may_finish = threading.Event()
+
+    def synthesize(text):
+        if text.startswith("First"):
+            first_may_finish.wait(5)
+        return text
+
+    speaker = SentenceSpeaker(synthesize)
+    # The second sentence finishes first but is held back until the first one is ready
+    assert speaker.feed("First sentence is slow. Second sentence is quick. ") == []
+    first_may_finish.set()
+    assert list(speaker.finish()) == ["First sentence is slow.", "Second sentence is quick."]
+    assert speaker.paths == ["First sentence is slow.", "Second sentence is quick."]
+
+
+def test_speaker_synthesises_the_final_fragment_and_skips_failures():
+    def synthesize(text):
+        if "broken" in text:
+            raise RuntimeError("synthesis failed")
+        return text
+
+    speaker = SentenceSpeaker(synthesize)
+    speaker.feed("This one is broken for sure. ")
+    speaker.feed("And this is the end")
+    assert list(speaker.finish()) == ["And this is the end"]
+    assert speaker.failures == 1
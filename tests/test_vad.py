@@ -0,0 +1,68 @@
+import numpy as np
+import speech_recognition as sr
+
+from utils.vad import speech_segments, split_at_pauses, voiced_audio
+
+RATE = 16000
+
+
+def audio(samples):
+    return sr.AudioData((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes(), RATE, 2)
+
+
+def silence(seconds):
+    return np.zeros(int(RATE * seconds))
+
+
+def speech(seconds, amplitude=0.3):
+    # A tone whose loudness swings like syllables, well above the margin between quiet and loud frames
+    t = np.arange(int(RATE * seconds)) / RATE
+    return amplitude * np.sin(2 * np.pi * 220 * t) * (0.55 + 0.45 * np.sin(2 * np.pi * 3 * t))
+
+
+def test_silence_has_no_segments():
+    assert speech_segments(audio(silence(2))) == []
+    assert voiced_audio(audio(silence(2))) == []
+
+
+def test_steady_background_noise_has_no_segments():
+    noise = np.random.default_rng(0).normal(0, 0.045, RATE * 2)  # about -27 dBFS
+    assert speech_segments(audio(noise)) == []
+
+
+def test_leading_and_trailing_silence_is_trimmed_with_padding():
+    segments = speech_segments(audio(np.concatenate([silence(1), speech(2), silence(1)])), padding_ms=200)
+    assert len(segments) == 1
+    start_ms, end_ms = segments[0]
+    assert 750 <= start_ms <= 1000
+    assert 3000 <= end_ms <= 3250
+
+
+def test_long_pauses_split_and_short_pauses_are_bridged():
+    samples = np.concatenate([speech(1), silence(0.2), speech(1), silence(1.5), speech(1)])
+    segments = speech_segments(audio(samples), min_silence_ms=500, padding_ms=0)
+    assert len(segments) == 2
+    assert segments[0][1] < 2500 < segments[1][0]
+
+
+def test_blips_shorter_than_min_speech_are_ignored():
+    samples = np.concatenate([silence(1), speech(0.06), silence(1)])
+    assert speech_segments(audio(samples), min_speech_ms=150) == []
+
+
+def test_long_speech_is_cut_at_the_quietest_frames():
+    samples = speech(40)
+    for dip_seconds in (9.0, 21.3, 33.0):
+        samples[int(dip_seconds * RATE):int((dip_seconds + 0.1) * RATE)] *= 0.001
+    segments = speech_segments(audio(samples), max_segment_ms=15000)
+    assert [start for start, _ in segments] == [0, 9000, 21300, 33000]
+    assert all(end - start <= 15000 for start, end in segments)
+
+
+def test_split_at_pauses_keeps_pieces_within_the_limit():
+    energies = np.full(1000, -20.0)  # no pause at all: 30 s of 30 ms frames
+    pieces = split_at_pauses(0, 30000, energies, max_segment_ms=7000, frame_ms=30)
+    assert pieces[0][0] == 0 and pieces[-1][1] == 30000
+    assert all(previous[1] == following[0] for previous, following in zip(pieces, pieces[1:]))
+    # Cuts fall on frame boundaries in the second half of the allowed length
+    assert all(3500 - 30 <= end - start <= 7000 for start, end in pieces[:-1])
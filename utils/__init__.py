@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+
+# Settings modules read the environment when they are imported, so .env is loaded before any of them
+load_dotenv()
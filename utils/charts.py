@@ -0,0 +1,47 @@
+import altair as alt
+
+
+def weekly_score_chart(weekly):
+    """Line chart of the average score per week"""
+    return alt.Chart(weekly, title="Average Score per Week").mark_line(point=True).encode(
+        x=alt.X("Week:T", title="Week"),
+        y=alt.Y("AverageScore:Q", title="Average Score (%)"),
+        tooltip=[
+            alt.Tooltip("Week:T"),
+            alt.Tooltip("AverageScore:Q", title="Average Score (%)", format=".2f"),
+            alt.Tooltip("Attempts:Q"),
+        ],
+    )
+
+
+def topic_score_chart(topics):
+    """Horizontal bar chart of the average score per topic"""
+    return alt.Chart(topics, title="Average Score per Topic").mark_bar().encode(
+        x=alt.X("AverageScore:Q", title="Average Score (%)"),
+        y=alt.Y("Topic:N", title="Topic", sort="x"),
+        tooltip=[
+            alt.Tooltip("Topic:N"),
+            alt.Tooltip("AverageScore:Q", title="Average Score (%)", format=".2f"),
+            alt.Tooltip("Attempts:Q"),
+        ],
+    )
+
+
+def difficulty_chart(difficulties):
+    """Pie chart of quiz attempts per difficulty level"""
+    base = alt.Chart(difficulties, title="Quiz Attempts Distribution (Easy/Medium/Hard)").transform_joinaggregate(
+        TotalAttempts="sum(Attempts)"
+    ).transform_calculate(
+        Share="datum.Attempts / datum.TotalAttempts"
+    ).encode(
+        theta=alt.Theta("Attempts:Q", stack=True),
+        color=alt.Color("Difficulty:N", title="Difficulty"),
+        tooltip=[
+            alt.Tooltip("Difficulty:N"),
+            alt.Tooltip("Attempts:Q"),
+            alt.Tooltip("Share:Q", format=".1%"),
+        ],
+    )
+    pie = base.mark_arc(outerRadius=120)
+    labels = base.mark_text(radius=140).encode(text=alt.Text("Share:Q", format=".1%"))
+    return pie + labels
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Location and limits of the shared content cache (override via .env)
+CACHE_PATH = os.getenv("CONTENT_CACHE_PATH", os.path.join(".cache", "content_cache.db"))
+CACHE_TTL_SECONDS = int(os.getenv("CONTENT_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+CACHE_MAX_ENTRIES = int(os.getenv("CONTENT_CACHE_MAX_ENTRIES", "1000"))
+# Hits refresh an entry's last-access time at most this often, so reads rarely take the write lock
+CACHE_TOUCH_INTERVAL_SECONDS = float(os.getenv("CONTENT_CACHE_TOUCH_INTERVAL_SECONDS", "60"))
+
+
+def make_cache_key(*parts):
+    """Build a stable cache key from the given parts (prompt, model, voice settings...)"""
+    raw = json.dumps(parts, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ContentCache:
+    """Persistent LLM content cache backed by SQLite.
+
+    The database file is shared by every session and every Streamlit worker
+    process; entries expire after ``ttl`` seconds and the least recently used
+    entries are evicted once more than ``max_entries`` are stored.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES,
+                 touch_interval=CACHE_TOUCH_INTERVAL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # One connection shared by all script threads, serialized by the lock.
+        # WAL mode lets other processes read while one of them writes.
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS content_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_content_cache_accessed ON content_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        """Return the cached value for key, or None if it is missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, accessed_at FROM content_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at, accessed_at = row
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM content_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            # LRU order only needs to be roughly right, so recently touched entries are not written again
+            if now - accessed_at >= self.touch_interval:
+                self._conn.execute(
+                    "UPDATE content_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+            return value
+
+    def set(self, key, value):
+        """Store value under key and evict expired / least recently used entries"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO content_cache (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.ttl:
+                self._conn.execute(
+                    "DELETE FROM content_cache WHERE created_at < ?", (now - self.ttl,)
+                )
+            if self.max_entries:
+                self._conn.execute("""
+                    DELETE FROM content_cache WHERE key IN (
+                        SELECT key FROM content_cache
+                        ORDER BY accessed_at DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM content_cache")
+            self._conn.commit()
@@ -0,0 +1,116 @@
+"""Multi-turn memory for the voice chatbot with a bounded prompt size.
+
+Each prompt carries a rolling summary of older turns followed by as many of
+the most recent turns as fit in CONVERSATION_TOKEN_BUDGET (a sliding window),
+so prompt size, and with it latency and cost, stays flat however long the
+conversation runs. Once the turns not yet summarised outgrow the budget, the
+oldest of them are folded into the summary by a background model call
+(site "conversation_summary"); the window keeps the prompt bounded until the
+new summary is ready.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.llm import estimate_tokens, generate_text
+from utils.metrics import CONVERSATION_HISTORY_TURNS, CONVERSATION_PROMPT_TOKENS, CONVERSATION_SUMMARIES
+
+logger = logging.getLogger(__name__)
+
+# Memory settings (override via .env)
+TOKEN_BUDGET = int(os.getenv("CONVERSATION_TOKEN_BUDGET", "1500"))
+SUMMARY_WORDS = int(os.getenv("CONVERSATION_SUMMARY_WORDS", "120"))
+SUMMARY_WORKERS = int(os.getenv("CONVERSATION_SUMMARY_WORKERS", "2"))
+
+# Shared by every session so simultaneous conversations cannot spawn unbounded threads
+_summary_executor = ThreadPoolExecutor(max_workers=SUMMARY_WORKERS, thread_name_prefix="conversation-summary")
+
+SPEAKERS = {"user": "Learner", "assistant": "Assistant"}
+
+
+def format_turns(turns):
+    return "\n".join(f"{SPEAKERS[role]}: {text}" for role, text in turns)
+
+
+def summarize(summary, turns):
+    """Fold turns into the running summary of a conversation"""
+    prompt = f"""Summarise this conversation between an English learner and a friendly voice assistant
+    in at most {SUMMARY_WORDS} words. Keep what the learner said about themselves, the topics discussed
+    and any question that is still open. Reply with the summary only.
+
+    Summary of the earlier conversation: {summary or "(none)"}
+
+    Conversation to add:
+    {format_turns(turns)}"""
+    return generate_text(prompt, site="conversation_summary").strip()
+
+
+class Conversation:
+    """One learner's chat: a rolling summary plus the turns it does not cover yet.
+
+    Kept in session state. prompt() builds the next request within the token
+    budget; add_turn() records the exchange and starts a summary when needed.
+    """
+
+    def __init__(self, token_budget=TOKEN_BUDGET):
+        self.token_budget = token_budget
+        self.summary = ""
+        self.turns = []
+        self._pending_summary = None
+
+    def prompt(self, text):
+        """Prompt for the learner's next message, with as much context as the budget allows"""
+        self._apply_summary()
+        budget = self.token_budget - estimate_tokens(self.summary)
+        recent = []
+        for turn in reversed(self.turns):
+            budget -= estimate_tokens(turn[1])
+            if budget < 0:
+                break
+            recent.insert(0, turn)
+
+        sections = ["You are a friendly and helpful voice assistant."]
+        if self.summary:
+            sections.append(f"Summary of the conversation so far: {self.summary}")
+        if recent:
+            sections.append(f"Most recent turns:\n{format_turns(recent)}")
+        sections.append(f"Respond to this message naturally and conversationally: {text}\n"
+                        "Keep your response concise and friendly.")
+        prompt = "\n\n".join(sections)
+
+        CONVERSATION_PROMPT_TOKENS.observe(estimate_tokens(prompt))
+        CONVERSATION_HISTORY_TURNS.observe(len(recent))
+        return prompt
+
+    def add_turn(self, text, reply):
+        self.turns += [("user", text), ("assistant", reply)]
+        self._apply_summary()
+        if self._pending_summary is None and self._unsummarized_tokens() > self.token_budget:
+            # Summarise everything except the newest turns that fit in half the budget
+            keep, budget = 0, self.token_budget // 2
+            for _, turn_text in reversed(self.turns):
+                budget -= estimate_tokens(turn_text)
+                if budget < 0:
+                    break
+                keep += 1
+            folded = self.turns[:len(self.turns) - keep]
+            future = _summary_executor.submit(summarize, self.summary, folded)
+            self._pending_summary = (future, len(folded))
+
+    def _unsummarized_tokens(self):
+        return sum(estimate_tokens(turn_text) for _, turn_text in self.turns)
+
+    def _apply_summary(self):
+        if self._pending_summary is None or not self._pending_summary[0].done():
+            return
+        future, folded = self._pending_summary
+        self._pending_summary = None
+        try:
+            self.summary = future.result()
+        except Exception:
+            # The turns stay unsummarised (the window still bounds the prompt); the next turn retries
+            logger.exception("Summarising the conversation failed")
+            CONVERSATION_SUMMARIES.inc(outcome="error")
+            return
+        CONVERSATION_SUMMARIES.inc(outcome="ok")
+        self.turns = self.turns[folded:]
@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+from utils.metrics import CONVERSATION_PROMPT_TOKENS, SPEECH_AUDIO_SECONDS, SPEECH_RECOGNITION_SECONDS
+from utils.metrics import render, site_summary
+from utils.quiz import repair_stats
+
+# Show the model-call metrics panel in the sidebar (override via .env)
+ADMIN_DEBUG_PANEL = os.getenv("ADMIN_DEBUG_PANEL", "0") == "1"
+
+
+def metrics_sidebar():
+    """Admin-only sidebar panel with per-call-site model metrics (enabled by ADMIN_DEBUG_PANEL=1)"""
+    if not ADMIN_DEBUG_PANEL:
+        return
+    with st.sidebar.expander("🛠️ Model call metrics"):
+        rows = site_summary()
+        if rows:
+            st.dataframe(pd.DataFrame(rows).set_index("Site"))
+        else:
+            st.caption("No model calls in this process yet.")
+
+        stats = repair_stats()
+        st.caption(
+            f"Quiz questions: {stats['questions_generated']} generated, "
+            f"{stats['invalid_rate']:.0%} invalid, {stats['repair_rate']:.0%} of those repaired"
+        )
+        for (recognizer,), (counts, total) in SPEECH_RECOGNITION_SECONDS.samples().items():
+            utterances = sum(counts)
+            audio = SPEECH_AUDIO_SECONDS.value(recognizer=recognizer)
+            st.caption(
+                f"Speech ({recognizer}): {utterances} utterances, {total / utterances:.2f}s mean, "
+                f"p95 ≤ {SPEECH_RECOGNITION_SECONDS.quantile(0.95, counts)}s, "
+                f"{total / audio if audio else 0:.2f}× real time"
+            )
+        for (), (counts, total) in CONVERSATION_PROMPT_TOKENS.samples().items():
+            prompts = sum(counts)
+            st.caption(
+                f"Conversation: {prompts} prompts, {total / prompts:.0f} tokens mean, "
+                f"p95 ≤ {CONVERSATION_PROMPT_TOKENS.quantile(0.95, counts)} tokens"
+            )
+        st.download_button("Download metrics", render(), file_name="metrics.prom", mime="text/plain")
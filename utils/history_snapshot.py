@@ -0,0 +1,155 @@
+import contextlib
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Columnar copy of the quiz history (override via .env)
+SNAPSHOT_DIR = os.getenv("HISTORY_SNAPSHOT_DIR", os.path.join(".cache", "history"))
+MAX_PARTS = int(os.getenv("HISTORY_SNAPSHOT_MAX_PARTS", "16"))
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = "snapshot.lock"
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Exclusive lock on path, held across every worker process sharing the file"""
+    with open(path, "a+b") as file:
+        if fcntl:
+            fcntl.flock(file, fcntl.LOCK_EX)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(file, fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class HistorySnapshot:
+    """Parquet snapshot of the quiz history, appended incrementally from the results store.
+
+    New results are written as small part files and periodically compacted into
+    one. Score is stored as a float column and the week bucket is precomputed, so
+    loading the history is a memory-mapped columnar read with no text parsing or
+    per-row Python work. The loaded frame is cached in-process per data version.
+    """
+
+    def __init__(self, store, directory=SNAPSHOT_DIR, max_parts=MAX_PARTS):
+        self.store = store
+        self.directory = directory
+        self.max_parts = max_parts
+        self._lock = threading.Lock()
+        self._cached_version = None
+        self._cached_frame = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path(), encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"version": 0, "rows": 0, "parts": []}
+
+    def _write_part(self, table, part):
+        # Written under a temporary name so no reader ever maps a half-written part
+        path = os.path.join(self.directory, part)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def _write_manifest(self, manifest):
+        tmp_path = f"{self._manifest_path()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+        os.replace(tmp_path, self._manifest_path())
+
+    @staticmethod
+    def _to_table(df):
+        df = df.copy()
+        df["Score"] = df["Score"].astype("float64")
+        # Vectorised week bucketing (Monday the week starts on)
+        df["Week"] = df["DateTime"].dt.to_period("W").dt.start_time
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    def sync(self):
+        """Append results added since the last sync, compacting if there are too many parts"""
+        # The directory is shared by every worker process, so the manifest update is guarded by a file lock
+        with self._lock, file_lock(os.path.join(self.directory, LOCK_NAME)):
+            manifest = self._read_manifest()
+            latest = self.store.latest_id()
+            if latest <= manifest["version"]:
+                return manifest
+
+            # Bounded by latest, so a result saved meanwhile is left for the next sync rather than counted twice
+            new_rows = self.store.results_since(manifest["version"], latest)
+            if not new_rows.empty:
+                part = f"part-{manifest['version'] + 1:012d}-{latest:012d}.parquet"
+                self._write_part(self._to_table(new_rows), part)
+                manifest["parts"].append(part)
+                manifest["rows"] += len(new_rows)
+            manifest["version"] = latest
+
+            if len(manifest["parts"]) > self.max_parts:
+                self._compact(manifest)
+            else:
+                self._write_manifest(manifest)
+            return manifest
+
+    def _compact(self, manifest):
+        old_parts = manifest["parts"]
+        table = self._read_parts(old_parts)
+        part = f"part-{1:012d}-{manifest['version']:012d}.parquet"
+        self._write_part(table, part)
+        manifest["parts"] = [part]
+        manifest["rows"] = table.num_rows
+        # Only delete the merged parts once the manifest no longer points at them
+        self._write_manifest(manifest)
+        for old_part in old_parts:
+            if old_part != part:
+                try:
+                    os.remove(os.path.join(self.directory, old_part))
+                except OSError:
+                    pass
+
+    def _read_parts(self, parts):
+        tables = [pq.read_table(os.path.join(self.directory, part), memory_map=True) for part in parts]
+        return pa.concat_tables(tables)
+
+    def load(self):
+        """Full quiz history as a DataFrame (DateTime, Topic, Difficulty, Score, Week)"""
+        manifest = self.sync()
+        with self._lock:
+            if self._cached_version == manifest["version"]:
+                return self._cached_frame
+
+            if manifest["parts"]:
+                try:
+                    table = self._read_parts(manifest["parts"])
+                except FileNotFoundError:
+                    # Another process compacted the parts in the meantime
+                    manifest = self._read_manifest()
+                    table = self._read_parts(manifest["parts"])
+                df = table.to_pandas().drop(columns=["id"])
+            else:
+                df = pd.DataFrame(columns=["DateTime", "Topic", "Difficulty", "Score", "Week"])
+            self._cached_version = manifest["version"]
+            self._cached_frame = df
+            return df
@@ -0,0 +1,60 @@
+import uuid
+
+import streamlit as st
+
+from utils.results_store import LearnerPartitions
+
+# Sessions whose learner has not entered a name get an id of their own with this prefix
+ANONYMOUS_PREFIX = "anonymous-"
+
+
+@st.cache_resource
+def get_learner_partitions():
+    """Quiz results databases, one per learner, shared by every page and session"""
+    return LearnerPartitions()
+
+
+def normalize_learner_id(name):
+    """Learner ids are case and whitespace insensitive ("" when no name was given)"""
+    return " ".join(str(name).split()).lower()
+
+
+def is_anonymous(learner_id):
+    return learner_id.startswith(ANONYMOUS_PREFIX)
+
+
+def _anonymous_learner_id():
+    # One per session, so unnamed learners neither share results nor hide quiz questions from each other
+    if "anonymous_learner_id" not in st.session_state:
+        st.session_state.anonymous_learner_id = f"{ANONYMOUS_PREFIX}{uuid.uuid4().hex[:16]}"
+    return st.session_state.anonymous_learner_id
+
+
+def _apply_learner_input():
+    st.session_state.learner_id = normalize_learner_id(st.session_state.learner_input) or _anonymous_learner_id()
+    st.query_params["learner"] = st.session_state.learner_id
+
+
+def learner_sidebar():
+    """Sidebar field identifying the current learner; returns their learner id.
+
+    The id is kept in session state (so it survives switching pages) and in the
+    ?learner= query parameter (so a bookmarked link reopens the same progress,
+    including that of a learner who never entered a name).
+    """
+    if "learner_id" not in st.session_state:
+        learner_id = normalize_learner_id(st.query_params.get("learner", ""))
+        if is_anonymous(learner_id):
+            st.session_state.anonymous_learner_id = learner_id
+        st.session_state.learner_id = learner_id or _anonymous_learner_id()
+        st.query_params["learner"] = st.session_state.learner_id
+    learner_id = st.session_state.learner_id
+    st.session_state.learner_input = "" if is_anonymous(learner_id) else learner_id
+    st.sidebar.text_input(
+        "Learner name",
+        key="learner_input",
+        on_change=_apply_learner_input,
+        placeholder="Anonymous (bookmark this page to keep your progress)",
+        help="Your quiz results and progress are kept under this name"
+    )
+    return learner_id
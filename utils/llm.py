@@ -0,0 +1,101 @@
+import functools
+import os
+import time
+
+import google.generativeai as genai
+
+from utils import metrics
+
+# Model and request settings shared by every page (override via .env)
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
+GENERATION_CONFIG = {
+    "temperature": float(os.getenv("GEMINI_TEMPERATURE", "1.0")),
+    "max_output_tokens": int(os.getenv("GEMINI_MAX_OUTPUT_TOKENS", "8192")),
+}
+
+# "gemini" (default), "replay" (offline stand-in) or "record" (gemini, saving responses for replay)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+
+
+@functools.lru_cache(maxsize=None)
+def get_model(model_name=MODEL_NAME):
+    """Process-wide Gemini model handle.
+
+    The API is configured once per process and the model (with its underlying
+    client channel) is reused by every page, session and Streamlit rerun
+    instead of being rebuilt at the top of each script run.
+    """
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    return genai.GenerativeModel(model_name, generation_config=GENERATION_CONFIG)
+
+
+@functools.lru_cache(maxsize=None)
+def get_replay_backend():
+    """Process-wide offline stand-in for Gemini (LLM_BACKEND=replay)"""
+    from utils.replay_backend import ReplayBackend
+    return ReplayBackend()
+
+
+@functools.lru_cache(maxsize=None)
+def get_recorder():
+    """Saves Gemini responses for later replay (LLM_BACKEND=record)"""
+    from utils.replay_backend import ResponseRecorder
+    return ResponseRecorder()
+
+
+def generate_content(prompt, stream=False, generation_config=None, model_name=MODEL_NAME, site=None):
+    """Send a prompt to Gemini through the shared model handle.
+
+    site names the calling feature (tutorial, quiz, conversation, ...); every
+    call is timed and its token usage and failures are counted under that
+    label, and the replay backend uses it to pick a response of the right shape.
+    """
+    metrics.start_exporters()
+    site = site or "unknown"
+    started = time.perf_counter()
+    try:
+        response = _call_backend(prompt, stream, generation_config, model_name, site)
+    except Exception as e:
+        metrics.record_llm_failure(site, started, e)
+        raise
+    if stream:
+        # Streamed calls are only complete once the caller has read every chunk
+        return metrics.InstrumentedStream(response, site, started)
+    metrics.record_llm_success(site, started, getattr(response, "usage_metadata", None))
+    return response
+
+
+def _call_backend(prompt, stream, generation_config, model_name, site):
+    if LLM_BACKEND == "replay":
+        return get_replay_backend().generate_content(prompt, stream=stream, site=site)
+
+    response = get_model(model_name).generate_content(
+        prompt,
+        stream=stream,
+        generation_config=generation_config,
+        request_options={"timeout": REQUEST_TIMEOUT_SECONDS},
+    )
+    if LLM_BACKEND == "record":
+        return get_recorder().record(prompt, site, response, stream)
+    return response
+
+
+def generate_text(prompt, **kwargs):
+    """Send a prompt to Gemini and return the full response text"""
+    return generate_content(prompt, **kwargs).text
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token), for budgeting without a count_tokens call"""
+    return max(1, len(text) // 4)
+
+
+def iter_text(response):
+    """Yield the text of each chunk of a streamed response"""
+    for chunk in response:
+        try:
+            yield chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. only safety metadata) carry nothing to show
+            continue
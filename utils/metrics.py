@@ -0,0 +1,299 @@
+"""Process-wide metrics for model calls, caches, quiz generation, speech and conversations.
+
+Counters and histograms are kept in memory and rendered in the Prometheus
+text exposition format. Set METRICS_FILE to have them written to a file
+periodically (e.g. for node_exporter's textfile collector) and/or
+METRICS_PORT to serve them at http://<host>:<port>/metrics.
+"""
+import atexit
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Exporter settings (override via .env)
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+METRICS_WRITE_INTERVAL_SECONDS = float(os.getenv("METRICS_WRITE_INTERVAL_SECONDS", "15"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 1500, 2000, 3000, 4000, 8000, 16000)
+TURN_BUCKETS = (0, 1, 2, 4, 8, 16, 32)
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = [(name, value) for name, value in zip(labelnames, key)] + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Current count; labels that are left out are summed over"""
+        with self._lock:
+            items = list(self._values.items())
+        return sum(value for key, value in items
+                   if all(key[self.labelnames.index(name)] == str(wanted) for name, wanted in labels.items()))
+
+    def samples(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.samples().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Bucketed distribution (plus sum and count) per label combination"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        """{label values: (per-bucket counts, sum)}; the last count is the +Inf overflow bucket"""
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+
+    def quantile(self, fraction, counts):
+        """Upper bucket bound below which fraction of the observations fall"""
+        target = fraction * sum(counts)
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            if count and running >= target:
+                return bound
+        return 0.0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self.samples().items()):
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', le)])} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {running}")
+        return lines
+
+
+# Model calls, labelled by call site (tutorial, practice, mistakes, quiz, quiz_repair, grammar_analysis, conversation)
+LLM_REQUEST_SECONDS = Histogram("llm_request_duration_seconds",
+                                "Time from sending a prompt until the full response was received", ["site"])
+LLM_FIRST_CHUNK_SECONDS = Histogram("llm_time_to_first_chunk_seconds",
+                                    "Time from sending a streamed prompt until its first chunk", ["site"])
+LLM_REQUESTS = Counter("llm_requests_total", "Model calls by outcome (ok or error)", ["site", "outcome"])
+LLM_ERRORS = Counter("llm_errors_total", "Failed model calls by exception type", ["site", "error"])
+LLM_RETRIES = Counter("llm_retries_total", "Model calls repeated after a failed or unusable response", ["site"])
+LLM_PROMPT_TOKENS = Counter("llm_prompt_tokens_total", "Prompt tokens reported by the model", ["site"])
+LLM_OUTPUT_TOKENS = Counter("llm_output_tokens_total", "Response tokens reported by the model", ["site"])
+CACHE_LOOKUPS = Counter("cache_lookups_total",
+                        "Generated-content lookups that avoided (hit) or needed (miss) a model call",
+                        ["site", "cache", "result"])
+
+# Quiz generation quality
+QUIZ_QUESTIONS = Counter("quiz_questions_total",
+                         "Generated quiz questions by validation status (generated, invalid, repaired)",
+                         ["status"])
+QUIZ_REPAIR_CALLS = Counter("quiz_repair_calls_total", "Repair requests for invalid quiz questions", ["outcome"])
+
+# Speech recognition, labelled by recognizer backend
+SPEECH_RECOGNITION_SECONDS = Histogram("speech_recognition_duration_seconds",
+                                       "Time to transcribe one recorded utterance", ["recognizer"])
+SPEECH_AUDIO_SECONDS = Counter("speech_audio_seconds_total", "Seconds of recorded audio transcribed",
+                               ["recognizer"])
+SPEECH_VOICED_SECONDS = Counter("speech_voiced_seconds_total",
+                                "Seconds of detected speech actually sent to the recognizer", ["recognizer"])
+
+# Text to speech (cache hits and misses are counted under cache_lookups_total{site="tts"})
+TTS_SYNTHESIS_SECONDS = Histogram("tts_synthesis_duration_seconds", "Time to synthesise one uncached clip")
+
+# Voice chatbot memory (summary calls are counted as model calls with site="conversation_summary")
+CONVERSATION_PROMPT_TOKENS = Histogram("conversation_prompt_tokens",
+                                       "Estimated tokens in each conversation prompt, history included",
+                                       buckets=TOKEN_BUCKETS)
+CONVERSATION_HISTORY_TURNS = Histogram("conversation_history_turns",
+                                       "Earlier turns sent verbatim with each conversation prompt",
+                                       buckets=TURN_BUCKETS)
+CONVERSATION_SUMMARIES = Counter("conversation_summaries_total",
+                                 "Rolling summaries of older turns by outcome (ok or error)", ["outcome"])
+
+METRICS = [LLM_REQUEST_SECONDS, LLM_FIRST_CHUNK_SECONDS, LLM_REQUESTS, LLM_ERRORS, LLM_RETRIES,
+           LLM_PROMPT_TOKENS, LLM_OUTPUT_TOKENS, CACHE_LOOKUPS, QUIZ_QUESTIONS, QUIZ_REPAIR_CALLS,
+           SPEECH_RECOGNITION_SECONDS, SPEECH_AUDIO_SECONDS, SPEECH_VOICED_SECONDS, TTS_SYNTHESIS_SECONDS,
+           CONVERSATION_PROMPT_TOKENS, CONVERSATION_HISTORY_TURNS, CONVERSATION_SUMMARIES]
+
+
+def render():
+    """All metrics in the Prometheus text format"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def site_summary():
+    """One row per call site: calls, errors, latency, tokens, retries and cache hit rate"""
+    sites = {key[0] for key in LLM_REQUESTS.samples()} | {key[0] for key in CACHE_LOOKUPS.samples()}
+    latencies = LLM_REQUEST_SECONDS.samples()
+    rows = []
+    for site in sorted(sites):
+        counts, total = latencies.get((site,), ([0] * (len(LLM_REQUEST_SECONDS.buckets) + 1), 0.0))
+        calls = sum(counts)
+        hits = CACHE_LOOKUPS.value(site=site, result="hit")
+        lookups = CACHE_LOOKUPS.value(site=site)
+        rows.append({
+            "Site": site,
+            "Calls": calls,
+            "Errors": LLM_REQUESTS.value(site=site, outcome="error"),
+            "Retries": LLM_RETRIES.value(site=site),
+            "Mean s": round(total / calls, 3) if calls else None,
+            "p50 s": LLM_REQUEST_SECONDS.quantile(0.5, counts) if calls else None,
+            "p95 s": LLM_REQUEST_SECONDS.quantile(0.95, counts) if calls else None,
+            "Prompt tokens": LLM_PROMPT_TOKENS.value(site=site),
+            "Output tokens": LLM_OUTPUT_TOKENS.value(site=site),
+            "Cache hits": hits,
+            "Cache misses": lookups - hits,
+            "Hit rate": round(hits / lookups, 3) if lookups else None,
+        })
+    return rows
+
+
+def record_cache_lookup(site, cache, hit):
+    CACHE_LOOKUPS.inc(site=site, cache=cache, result="hit" if hit else "miss")
+
+
+def _record_usage(site, usage):
+    if usage is None:
+        return
+    LLM_PROMPT_TOKENS.inc(getattr(usage, "prompt_token_count", 0) or 0, site=site)
+    LLM_OUTPUT_TOKENS.inc(getattr(usage, "candidates_token_count", 0) or 0, site=site)
+
+
+def record_llm_success(site, started, usage):
+    LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, site=site)
+    LLM_REQUESTS.inc(site=site, outcome="ok")
+    _record_usage(site, usage)
+
+
+def record_llm_failure(site, started, error):
+    LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, site=site)
+    LLM_REQUESTS.inc(site=site, outcome="error")
+    LLM_ERRORS.inc(site=site, error=type(error).__name__)
+
+
+class InstrumentedStream:
+    """Wraps a streamed response so the call is timed (and its tokens counted) once it is fully read"""
+
+    def __init__(self, response, site, started):
+        self._response = response
+        self._site = site
+        self._started = started
+
+    def __iter__(self):
+        first = True
+        try:
+            for chunk in self._response:
+                if first:
+                    LLM_FIRST_CHUNK_SECONDS.observe(time.perf_counter() - self._started, site=self._site)
+                    first = False
+                yield chunk
+        except Exception as e:
+            record_llm_failure(self._site, self._started, e)
+            raise
+        record_llm_success(self._site, self._started, getattr(self._response, "usage_metadata", None))
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+def write_metrics_file(path=METRICS_FILE):
+    """Write the current metrics to path atomically, so a scraper never reads half a file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write(render())
+    os.replace(temp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _write_periodically(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            write_metrics_file(path)
+        except OSError:
+            logger.exception("Writing metrics to %s failed", path)
+
+
+@functools.lru_cache(maxsize=None)
+def start_exporters():
+    """Start the configured metrics file writer and HTTP endpoint (once per process)"""
+    if METRICS_FILE:
+        threading.Thread(target=_write_periodically, args=(METRICS_FILE, METRICS_WRITE_INTERVAL_SECONDS),
+                         name="metrics-file", daemon=True).start()
+        atexit.register(write_metrics_file, METRICS_FILE)
+    if METRICS_PORT:
+        try:
+            server = ThreadingHTTPServer(("", METRICS_PORT), _MetricsHandler)
+        except OSError:
+            logger.exception("Could not serve metrics on port %d", METRICS_PORT)
+            return
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
@@ -0,0 +1,88 @@
+"""Materialise tutorial content for the whole GRAMMAR_TOPICS catalogue.
+
+Usage:
+    python -m utils.precompute_tutorials [--concurrency 4] [--force]
+
+Only entries whose prompts (or model) changed since the last run are
+regenerated, so re-running after editing one prompt template is cheap.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from utils.llm import MODEL_NAME, generate_text
+from utils.metrics import LLM_RETRIES
+from utils.tutorial_content import (BUNDLE_PATH, CONTENT_PROMPTS, entry_key,
+                                    iter_catalogue, load_bundle, prompt_fingerprint,
+                                    save_bundle)
+
+def generate_entry(model_name, topic, difficulty, retries=2):
+    """Generate explanation, practice questions and common mistakes for one entry"""
+    entry = {
+        "topic": topic,
+        "difficulty": difficulty,
+        "prompt_hash": prompt_fingerprint(topic, difficulty, model_name),
+    }
+    for kind, build_prompt in CONTENT_PROMPTS.items():
+        site = "tutorial" if kind == "explanation" else kind
+        for attempt in range(retries + 1):
+            try:
+                entry[kind] = generate_text(build_prompt(topic, difficulty), model_name=model_name, site=site)
+                break
+            except Exception:
+                if attempt == retries:
+                    raise
+                LLM_RETRIES.inc(site=site)
+                time.sleep(2 ** attempt)
+    entry["generated_at"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate tutorial content for every topic and difficulty")
+    parser.add_argument("--output", default=BUNDLE_PATH, help="bundle file to write")
+    parser.add_argument("--model", default=MODEL_NAME, help="Gemini model name")
+    parser.add_argument("--concurrency", type=int, default=4, help="maximum parallel generations")
+    parser.add_argument("--force", action="store_true", help="regenerate every entry, even if up to date")
+    args = parser.parse_args()
+
+    bundle = load_bundle(args.output)
+    entries = bundle.get("entries", {})
+
+    # Only refresh entries whose prompt template (or model) changed
+    pending = [
+        (topic, difficulty) for topic, difficulty in iter_catalogue()
+        if args.force
+        or entries.get(entry_key(topic, difficulty), {}).get("prompt_hash")
+        != prompt_fingerprint(topic, difficulty, args.model)
+    ]
+    print(f"{len(pending)} of {len(list(iter_catalogue()))} entries need generating")
+    if not pending:
+        return
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = {
+            executor.submit(generate_entry, args.model, topic, difficulty): (topic, difficulty)
+            for topic, difficulty in pending
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            topic, difficulty = futures[future]
+            try:
+                entries[entry_key(topic, difficulty)] = future.result()
+                print(f"[{done}/{len(pending)}] {topic} ({difficulty})")
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{len(pending)}] FAILED {topic} ({difficulty}): {e}")
+
+    bundle["version"] = bundle.get("version", 0) + 1
+    bundle["model"] = args.model
+    bundle["generated_at"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    bundle["entries"] = entries
+    save_bundle(bundle, args.output)
+    print(f"Wrote bundle version {bundle['version']} to {args.output} ({failed} failed)")
+
+
+if __name__ == "__main__":
+    main()
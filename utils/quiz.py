@@ -0,0 +1,335 @@
+import difflib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.llm import generate_content, iter_text
+from utils.metrics import LLM_RETRIES, QUIZ_QUESTIONS, QUIZ_REPAIR_CALLS
+
+OPTION_KEYS = ("A", "B", "C", "D")
+
+# Sharded generation settings (override via .env)
+SHARD_SIZE = int(os.getenv("QUIZ_SHARD_SIZE", "3"))
+SHARD_WORKERS = int(os.getenv("QUIZ_SHARD_WORKERS", "8"))
+SHARD_ROUNDS = int(os.getenv("QUIZ_SHARD_ROUNDS", "2"))
+DUPLICATE_SIMILARITY = float(os.getenv("QUIZ_DUPLICATE_SIMILARITY", "0.9"))
+
+# Shared by every session so concurrent quiz requests cannot spawn unbounded threads
+_shard_executor = ThreadPoolExecutor(max_workers=SHARD_WORKERS, thread_name_prefix="quiz-shard")
+
+# Ask Gemini for raw JSON instead of markdown-fenced text
+JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+# How many small repair calls a single generation may spend on invalid questions
+REPAIR_ATTEMPTS = int(os.getenv("QUIZ_REPAIR_ATTEMPTS", "2"))
+
+def repair_stats():
+    """Snapshot of the repair counters plus the derived invalid and repair rates"""
+    stats = {
+        "questions_generated": QUIZ_QUESTIONS.value(status="generated"),
+        "questions_invalid": QUIZ_QUESTIONS.value(status="invalid"),
+        "questions_repaired": QUIZ_QUESTIONS.value(status="repaired"),
+        "repair_calls": QUIZ_REPAIR_CALLS.value(),
+        "repair_call_failures": QUIZ_REPAIR_CALLS.value(outcome="error"),
+    }
+    stats["invalid_rate"] = stats["questions_invalid"] / stats["questions_generated"] if stats["questions_generated"] else 0.0
+    stats["repair_rate"] = stats["questions_repaired"] / stats["questions_invalid"] if stats["questions_invalid"] else 0.0
+    return stats
+
+
+def quiz_prompt(topic, difficulty, num_questions, part=None):
+    """Prompt asking Gemini for a multiple choice quiz in JSON format"""
+    prompt = f"""
+    Create a multiple choice quiz about {topic} with {num_questions} questions at {difficulty} difficulty level.
+    
+    Return the response in the following JSON format:
+    {{
+        "questions": [
+            {{
+                "question": "Question text here",
+                "options": {{
+                    "A": "First option",
+                    "B": "Second option",
+                    "C": "Third option",
+                    "D": "Fourth option"
+                }},
+                "correct_answer": "A",
+                "explanation": "Explanation of correct answer"
+            }}
+        ]
+    }}
+    
+    Make sure:
+    - Questions increase in complexity
+    - Only one correct answer per question
+    - Clear and concise explanations
+    - For {difficulty} difficulty level
+    - All related to {topic}
+    """
+    if part is not None:
+        prompt += f"""- This is part {part} of a larger quiz, so vary the sub-topics to avoid repeating the other parts
+    """
+    return prompt
+
+
+def question_errors(question):
+    """List the schema problems of a single quiz question (empty if it is valid)"""
+    if not isinstance(question, dict):
+        return ["question is not an object"]
+
+    errors = []
+    if not isinstance(question.get("question"), str) or not question["question"].strip():
+        errors.append("missing question text")
+
+    options = question.get("options")
+    if not isinstance(options, dict) or set(options) != set(OPTION_KEYS):
+        errors.append("options must have exactly the keys A, B, C and D")
+    elif not all(isinstance(text, str) and text.strip() for text in options.values()):
+        errors.append("options must be non-empty strings")
+
+    if question.get("correct_answer") not in OPTION_KEYS:
+        errors.append("correct_answer must be one of A, B, C or D")
+
+    if not isinstance(question.get("explanation"), str) or not question["explanation"].strip():
+        errors.append("missing explanation")
+    return errors
+
+
+class QuestionStreamParser:
+    """Incrementally extract question objects from a streamed JSON quiz response.
+
+    Every object that closes directly inside a JSON array (the "questions" list)
+    is parsed as soon as its closing brace arrives. Objects that fail to parse are
+    skipped, so one malformed question does not throw away the rest of the quiz.
+    """
+
+    def __init__(self):
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+        self._capturing = False
+        self._capture_depth = 0
+        self._buffer = []
+
+    def feed(self, text):
+        """Consume the next chunk of text and return the objects completed by it"""
+        completed = []
+        for char in text:
+            if self._capturing:
+                self._buffer.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if char == "{" and not self._capturing and self._stack and self._stack[-1] == "[":
+                    self._capturing = True
+                    self._capture_depth = len(self._stack)
+                    self._buffer = [char]
+                self._stack.append(char)
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if char == "}" and self._capturing and len(self._stack) == self._capture_depth:
+                    self._capturing = False
+                    try:
+                        obj = json.loads("".join(self._buffer))
+                    except ValueError:
+                        continue
+                    if isinstance(obj, dict):
+                        completed.append(obj)
+        return completed
+
+
+def parse_quiz(text):
+    """Parse the model's quiz response into a list of questions.
+
+    If the payload as a whole is not valid JSON, the individual question objects
+    that are still well-formed are salvaged instead of failing the whole quiz.
+    """
+    clean_json = re.sub(r'```json\s*([\s\S]+?)\s*```', r'\1', text).strip()
+    try:
+        data = json.loads(clean_json)
+    except ValueError:
+        questions = QuestionStreamParser().feed(clean_json)
+        if not questions:
+            raise
+        return questions
+    if not isinstance(data, dict) or not isinstance(data.get("questions"), list):
+        raise ValueError("quiz response has no 'questions' list")
+    return data["questions"]
+
+
+def _comparable_text(question):
+    # Question and options together: the same stem with different options is a different question
+    parts = [question["question"]] + [question["options"][key] for key in sorted(question["options"])]
+    return " ".join(" ".join(parts).lower().split())
+
+
+def is_near_duplicate(question, others, threshold=DUPLICATE_SIMILARITY):
+    """Whether question asks (almost) the same thing as one of others"""
+    text = _comparable_text(question)
+    for other in others:
+        if difflib.SequenceMatcher(None, text, _comparable_text(other)).ratio() >= threshold:
+            return True
+    return False
+
+
+def merge_questions(questions, new_questions, limit):
+    """Append new_questions to questions, dropping near-duplicates, up to limit"""
+    for question in new_questions:
+        if len(questions) >= limit:
+            break
+        if not is_near_duplicate(question, questions):
+            questions.append(question)
+    return questions
+
+
+def repair_prompt(topic, difficulty, broken_questions):
+    """Prompt asking Gemini to fix only the given invalid questions"""
+    listing = "\n".join(
+        f"Question {i + 1}: {json.dumps(question, ensure_ascii=False)}\nProblems: {'; '.join(errors)}"
+        for i, (question, errors) in enumerate(broken_questions)
+    )
+    return f"""
+    The following multiple choice questions about {topic} at {difficulty} difficulty level are invalid.
+    Fix each one so that it has question text, exactly four options "A", "B", "C" and "D",
+    a "correct_answer" that is one of those keys, and an "explanation" of the correct answer.
+    Keep the original question wherever possible.
+
+    {listing}
+
+    Return {{"questions": [...]}} with the fixed questions in the same order, using the same format.
+    """
+
+
+def repair_questions(topic, difficulty, broken_questions, attempts=REPAIR_ATTEMPTS):
+    """Re-request just the invalid questions, within a retry budget.
+
+    broken_questions is a list of (question, errors) pairs; returns the questions
+    that were repaired into valid ones. Questions that are still invalid after the
+    budget is spent are dropped.
+    """
+    repaired = []
+    for _ in range(attempts):
+        if not broken_questions:
+            break
+        try:
+            response = generate_content(
+                repair_prompt(topic, difficulty, broken_questions),
+                generation_config=JSON_GENERATION_CONFIG,
+                site="quiz_repair",
+            )
+            candidates = parse_quiz(response.text)
+        except Exception:
+            QUIZ_REPAIR_CALLS.inc(outcome="error")
+            continue
+        QUIZ_REPAIR_CALLS.inc(outcome="ok")
+
+        still_broken = []
+        for index, (question, errors) in enumerate(broken_questions):
+            candidate = candidates[index] if index < len(candidates) else question
+            candidate_errors = question_errors(candidate)
+            if candidate_errors:
+                still_broken.append((candidate, candidate_errors))
+            else:
+                repaired.append(candidate)
+        broken_questions = still_broken
+
+    QUIZ_QUESTIONS.inc(len(repaired), status="repaired")
+    return repaired
+
+
+def generate_questions(topic, difficulty, num_questions, part=None, on_question=None):
+    """Generate quiz questions with Gemini, repairing the invalid ones.
+
+    The response is requested in JSON mode, streamed and parsed incrementally:
+    on_question (if given) is called with each valid question as soon as its
+    JSON object is complete. Questions that fail schema validation are sent back
+    in one small repair request instead of regenerating the whole quiz.
+    Raises ValueError if no valid question could be produced.
+    """
+    response = generate_content(
+        quiz_prompt(topic, difficulty, num_questions, part),
+        stream=True,
+        generation_config=JSON_GENERATION_CONFIG,
+        site="quiz",
+    )
+    parser = QuestionStreamParser()
+    questions = []
+    broken_questions = []
+
+    def accept(question):
+        if len(questions) < num_questions:
+            questions.append(question)
+            if on_question is not None:
+                on_question(question)
+
+    for chunk_text in iter_text(response):
+        for question in parser.feed(chunk_text):
+            QUIZ_QUESTIONS.inc(status="generated")
+            errors = question_errors(question)
+            if errors:
+                QUIZ_QUESTIONS.inc(status="invalid")
+                broken_questions.append((question, errors))
+            else:
+                accept(question)
+
+    if broken_questions and len(questions) < num_questions:
+        for question in repair_questions(topic, difficulty, broken_questions):
+            accept(question)
+
+    if not questions:
+        raise ValueError("quiz response contained no valid questions")
+    return questions
+
+
+def generate_questions_sharded(topic, difficulty, num_questions, shard_size=SHARD_SIZE, on_question=None):
+    """Generate a quiz as several small concurrent requests instead of one long one.
+
+    Each shard is validated on its own, the shards are merged with near-duplicate
+    questions dropped, and any gap left by failed shards or duplicates is
+    re-requested (up to SHARD_ROUNDS extra rounds). Wall-clock time is bounded by
+    the slowest shard rather than the length of the whole quiz. on_question (if
+    given) is called from the calling thread with each accepted question as soon
+    as its shard finishes.
+    """
+    questions = []
+    part = 0
+    for round_number in range(SHARD_ROUNDS + 1):
+        missing = num_questions - len(questions)
+        if missing <= 0:
+            break
+
+        futures = []
+        for start in range(0, missing, shard_size):
+            part += 1
+            futures.append(_shard_executor.submit(
+                generate_questions, topic, difficulty, min(shard_size, missing - start), part
+            ))
+        if round_number:
+            LLM_RETRIES.inc(len(futures), site="quiz")
+        for future in as_completed(futures):
+            try:
+                shard_questions = future.result()
+            except Exception:
+                # A failed shard is re-requested in the next round
+                continue
+            accepted = len(questions)
+            merge_questions(questions, shard_questions, num_questions)
+            if on_question is not None:
+                for question in questions[accepted:]:
+                    on_question(question)
+
+    if not questions:
+        raise ValueError("no shard returned valid questions")
+    return questions
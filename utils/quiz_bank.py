@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from utils.quiz import question_errors
+
+logger = logging.getLogger(__name__)
+
+# Location and sizing of the pre-generated question bank (override via .env)
+QUIZ_BANK_PATH = os.getenv("QUIZ_BANK_PATH", os.path.join(".cache", "quiz_bank.db"))
+LOW_WATERMARK = int(os.getenv("QUIZ_BANK_LOW_WATERMARK", "10"))
+REFILL_BATCH_SIZE = int(os.getenv("QUIZ_BANK_REFILL_BATCH_SIZE", "10"))
+
+
+def question_fingerprint(question):
+    """Stable identity of a question, used to avoid storing duplicates"""
+    text = " ".join(question["question"].lower().split())
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class QuizBank:
+    """Validated quiz questions indexed by (topic, difficulty).
+
+    Quizzes are served by sampling questions a learner has not seen yet, and a
+    background worker tops up any bucket that falls below the low watermark so
+    the interactive path rarely has to wait on the model.
+    """
+
+    def __init__(self, path=QUIZ_BANK_PATH, low_watermark=LOW_WATERMARK,
+                 refill_batch_size=REFILL_BATCH_SIZE):
+        self.path = path
+        self.low_watermark = low_watermark
+        self.refill_batch_size = refill_batch_size
+        self._lock = threading.Lock()
+        self._refill_queue = queue.Queue()
+        self._pending_refills = set()
+        self._worker = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS questions (
+                id INTEGER PRIMARY KEY,
+                topic TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                UNIQUE (topic, difficulty, fingerprint)
+            );
+            CREATE INDEX IF NOT EXISTS idx_questions_bucket ON questions (topic, difficulty);
+            CREATE TABLE IF NOT EXISTS seen_questions (
+                learner_id TEXT NOT NULL,
+                question_id INTEGER NOT NULL,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (learner_id, question_id)
+            );
+        """)
+        self._conn.commit()
+
+    def add_questions(self, topic, difficulty, questions, seen_by=None):
+        """Store the valid questions (skipping duplicates), optionally marking them as seen"""
+        now = time.time()
+        added = 0
+        with self._lock:
+            for question in questions:
+                if question_errors(question):
+                    continue
+                fingerprint = question_fingerprint(question)
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO questions (topic, difficulty, fingerprint, payload, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (topic, difficulty, fingerprint, json.dumps(question), now),
+                )
+                added += cursor.rowcount
+                if seen_by is not None:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO seen_questions (learner_id, question_id, seen_at) "
+                        "SELECT ?, id, ? FROM questions WHERE topic = ? AND difficulty = ? AND fingerprint = ?",
+                        (seen_by, now, topic, difficulty, fingerprint),
+                    )
+            self._conn.commit()
+        return added
+
+    def unseen_count(self, topic, difficulty, learner_id):
+        """Number of questions in a bucket the learner has not been served yet"""
+        with self._lock:
+            (count,) = self._conn.execute("""
+                SELECT COUNT(*) FROM questions
+                WHERE topic = ? AND difficulty = ?
+                AND id NOT IN (SELECT question_id FROM seen_questions WHERE learner_id = ?)
+            """, (topic, difficulty, learner_id)).fetchone()
+        return count
+
+    def draw(self, topic, difficulty, num_questions, learner_id):
+        """Sample up to num_questions unseen questions and mark them as seen"""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT id, payload FROM questions
+                WHERE topic = ? AND difficulty = ?
+                AND id NOT IN (SELECT question_id FROM seen_questions WHERE learner_id = ?)
+                ORDER BY RANDOM()
+                LIMIT ?
+            """, (topic, difficulty, learner_id, num_questions)).fetchall()
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_questions (learner_id, question_id, seen_at) VALUES (?, ?, ?)",
+                [(learner_id, question_id, now) for question_id, _ in rows],
+            )
+            self._conn.commit()
+        return [json.loads(payload) for _, payload in rows]
+
+    def start_refill_worker(self, generate):
+        """Start the background thread that refills buckets using generate(topic, difficulty, n)"""
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._refill_loop, args=(generate,), name="quiz-bank-refill", daemon=True
+            )
+            self._worker.start()
+
+    def request_refill(self, topic, difficulty, learner_id):
+        """Queue a background refill if the learner is running low on unseen questions"""
+        if self.unseen_count(topic, difficulty, learner_id) >= self.low_watermark:
+            return
+        with self._lock:
+            if (topic, difficulty) in self._pending_refills:
+                return
+            self._pending_refills.add((topic, difficulty))
+        self._refill_queue.put((topic, difficulty))
+
+    def _refill_loop(self, generate):
+        while True:
+            topic, difficulty = self._refill_queue.get()
+            try:
+                questions = generate(topic, difficulty, self.refill_batch_size)
+                added = self.add_questions(topic, difficulty, questions)
+                logger.info("Refilled %s (%s) with %d questions", topic, difficulty, added)
+            except Exception:
+                logger.exception("Refilling %s (%s) failed", topic, difficulty)
+            finally:
+                with self._lock:
+                    self._pending_refills.discard((topic, difficulty))
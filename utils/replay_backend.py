@@ -0,0 +1,223 @@
+"""Recorded-response stand-in for Gemini, for offline benchmarking and load tests.
+
+Select it with LLM_BACKEND=replay. Each prompt is answered from the
+recordings file (exact prompt match first, then any recording for the same
+call site) or, failing that, with a synthetic response of the right shape for
+that call site. Latency, streaming chunk pacing and error rate are injected
+from the settings below, driven by a seeded RNG so runs are reproducible.
+
+LLM_BACKEND=record calls the real model and saves every response to the
+recordings file so it can be replayed later.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from google.api_core import exceptions as api_exceptions
+
+from utils.llm import estimate_tokens
+
+# Replay settings (override via .env)
+RECORDINGS_PATH = os.getenv("REPLAY_RECORDINGS_PATH", os.path.join("benchmarks", "recordings.json"))
+LATENCY_MS = float(os.getenv("REPLAY_LATENCY_MS", "0"))
+LATENCY_JITTER_MS = float(os.getenv("REPLAY_LATENCY_JITTER_MS", "0"))
+CHUNK_CHARS = int(os.getenv("REPLAY_CHUNK_CHARS", "80"))
+CHUNK_DELAY_MS = float(os.getenv("REPLAY_CHUNK_DELAY_MS", "0"))
+ERROR_RATE = float(os.getenv("REPLAY_ERROR_RATE", "0"))
+SEED = int(os.getenv("REPLAY_SEED", "0"))
+
+
+def prompt_key(prompt):
+    """Key of a prompt inside the recordings file"""
+    return hashlib.sha256(" ".join(prompt.split()).encode("utf-8")).hexdigest()
+
+
+def load_recordings(path=RECORDINGS_PATH):
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"responses": {}}
+
+
+class ReplayUsage:
+    """Stand-in for the SDK's usage_metadata"""
+
+    def __init__(self, prompt, text):
+        self.prompt_token_count = estimate_tokens(prompt)
+        self.candidates_token_count = estimate_tokens(text)
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+
+class ReplayChunk:
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class ReplayResponse:
+    """Mimics GenerateContentResponse: .text, .usage_metadata and iteration over chunks"""
+
+    def __init__(self, prompt, text, chunk_chars, chunk_delay, stream):
+        self.text = text
+        self.usage_metadata = ReplayUsage(prompt, text)
+        self._chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)] or [""]
+        self._chunk_delay = chunk_delay
+        self._stream = stream
+
+    def __iter__(self):
+        for index, chunk in enumerate(self._chunks):
+            if self._stream and index and self._chunk_delay:
+                time.sleep(self._chunk_delay)
+            last = index == len(self._chunks) - 1
+            yield ReplayChunk(chunk, self.usage_metadata if last else None)
+
+
+class ReplayBackend:
+    """Answers prompts from recordings with injected latency, pacing and errors"""
+
+    def __init__(self, recordings_path=RECORDINGS_PATH, latency_ms=LATENCY_MS,
+                 latency_jitter_ms=LATENCY_JITTER_MS, chunk_chars=CHUNK_CHARS,
+                 chunk_delay_ms=CHUNK_DELAY_MS, error_rate=ERROR_RATE, seed=SEED):
+        recordings = load_recordings(recordings_path)
+        self.responses = recordings.get("responses", {})
+        self.by_site = {}
+        for recording in self.responses.values():
+            self.by_site.setdefault(recording.get("site"), []).append(recording["text"])
+
+        self.latency = latency_ms / 1000
+        self.latency_jitter = latency_jitter_ms / 1000
+        self.chunk_chars = max(1, chunk_chars)
+        self.chunk_delay = chunk_delay_ms / 1000
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def _draw(self):
+        with self._lock:
+            self._calls += 1
+            return self._calls, self._rng.random(), self._rng.uniform(-1, 1)
+
+    def generate_content(self, prompt, stream=False, site=None, **kwargs):
+        call, error_draw, jitter_draw = self._draw()
+        time.sleep(max(0.0, self.latency + jitter_draw * self.latency_jitter))
+        if error_draw < self.error_rate:
+            raise api_exceptions.ServiceUnavailable("injected replay backend error")
+
+        text = self._lookup(prompt, site, call)
+        response = ReplayResponse(prompt, text, self.chunk_chars, self.chunk_delay, stream)
+        if not stream:
+            # A blocking call pays for the whole generation up front
+            time.sleep(self.chunk_delay * (len(response._chunks) - 1))
+        return response
+
+    def _lookup(self, prompt, site, call):
+        recording = self.responses.get(prompt_key(prompt))
+        if recording is not None:
+            return recording["text"]
+        if self.by_site.get(site) and site not in ("quiz", "quiz_repair"):
+            # Quiz answers depend on the requested shape, so only exact matches are reused
+            candidates = self.by_site[site]
+            return candidates[call % len(candidates)]
+        return synthetic_response(prompt, site, call)
+
+
+def synthetic_response(prompt, site, call):
+    """Deterministic placeholder response with the shape the call site expects"""
+    if site == "quiz":
+        match = re.search(r"with (\d+) questions", prompt)
+        count = int(match.group(1)) if match else 5
+        return json.dumps({"questions": [_synthetic_question(prompt, call, i) for i in range(count)]})
+    if site == "quiz_repair":
+        count = len(re.findall(r"^\s*Question \d+:", prompt, flags=re.MULTILINE)) or 1
+        return json.dumps({"questions": [_synthetic_question(prompt, call, i) for i in range(count)]})
+    if site == "grammar_analysis":
+        return (
+            "Grammar Analysis :\nThe text is mostly grammatical with minor tense inconsistencies.\n\n"
+            "Sentence Formation :\nSentences are clear but could vary more in length and structure.\n\n"
+            "Score : 7/10\n\n"
+            "Suggestions :\n1. &emsp; Keep verb tenses consistent.\n"
+            "2. &emsp; Combine short sentences with conjunctions.\n"
+            "3. &emsp; Use more precise vocabulary.\n"
+        )
+    if site in ("practice", "mistakes"):
+        return (
+            "Easy: **Question 1:** Identify the noun in 'The cat sleeps.' Answer: cat.\n"
+            "Medium: **Question 2:** Correct 'She go to school.' Answer: She goes to school.\n"
+            "Hard: **Question 3:** Explain the error in 'Neither of them are here.' Answer: use 'is'.\n"
+        )
+    if site == "conversation":
+        return "That sounds great! Tell me a little more about it. What did you enjoy the most?"
+    if site == "conversation_summary":
+        return "The learner has been chatting about their day and what they enjoyed; the assistant asked follow-up questions."
+    paragraph = (
+        "**Definition:** This is a stand-in explanation used for offline benchmarking. "
+        "It follows the structure of a real tutorial response with headings and examples.\n\n"
+    )
+    return "## Overview\n\n" + paragraph * 8
+
+
+SYNTHETIC_WORDS = (
+    "teacher river garden quickly yesterday beautiful running books silently window "
+    "children happily mountain wrote careful bright library journey often ancient "
+    "market singing gentle because although whose rarely kitchen travelled promise"
+).split()
+
+
+def _synthetic_question(prompt, call, index):
+    # Distinct wording per question so near-duplicate filtering keeps them all
+    rng = random.Random(f"{prompt_key(prompt)}-{call}-{index}")
+    sentence = " ".join(rng.sample(SYNTHETIC_WORDS, 7))
+    answer = "ABCD"[index % 4]
+    return {
+        "question": f"Which word is used correctly in: '{sentence}'?",
+        "options": {key: rng.choice(SYNTHETIC_WORDS) for key in ("A", "B", "C", "D")},
+        "correct_answer": answer,
+        "explanation": f"Option {answer} fits the sentence '{sentence}'.",
+    }
+
+
+class ResponseRecorder:
+    """Saves real model responses to the recordings file (LLM_BACKEND=record)"""
+
+    def __init__(self, recordings_path=RECORDINGS_PATH):
+        self.path = recordings_path
+        self._lock = threading.Lock()
+
+    def save(self, prompt, site, text):
+        with self._lock:
+            recordings = load_recordings(self.path)
+            recordings.setdefault("responses", {})[prompt_key(prompt)] = {
+                "site": site,
+                "prompt": prompt,
+                "text": text,
+            }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(recordings, file, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def record(self, prompt, site, response, stream):
+        """Pass the response through unchanged, saving its text once it is complete"""
+        if not stream:
+            self.save(prompt, site, response.text)
+            return response
+        return self._record_stream(prompt, site, response)
+
+    def _record_stream(self, prompt, site, response):
+        parts = []
+        for chunk in response:
+            try:
+                parts.append(chunk.text)
+            except ValueError:
+                pass
+            yield chunk
+        self.save(prompt, site, "".join(parts))
@@ -0,0 +1,314 @@
+import csv
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import pandas as pd
+
+# Quiz results database and the legacy CSV it replaces (override via .env)
+RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH", "quiz_results.db")
+LEGACY_CSV_PATH = os.getenv("RESULTS_CSV_PATH", "quiz_results.csv")
+
+# Every other learner gets their own database file in this directory
+RESULTS_DIR = os.getenv("RESULTS_DIR", os.path.join("data", "learners"))
+MAX_OPEN_PARTITIONS = int(os.getenv("RESULTS_MAX_OPEN_PARTITIONS", "64"))
+
+# Results recorded before learners were identified belong to this learner (enter it as the learner name to see them)
+LEGACY_LEARNER_ID = "guest"
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Monday of the week a result was taken in (same weeks as pandas' to_period("W"))
+WEEK_START_SQL = "date({}, 'weekday 0', '-6 days')"
+
+# Pre-aggregated count/sum/max of scores, maintained on every write:
+# table -> (key column, position of its source value in a result row)
+ROLLUP_TABLES = {
+    "rollup_week": ("week_start", 0),
+    "rollup_topic": ("topic", 1),
+    "rollup_difficulty": ("difficulty", 2),
+}
+
+
+class ResultsStore:
+    """Quiz results stored in SQLite (WAL mode) instead of an append-only CSV.
+
+    Writes from concurrent sessions and worker processes are serialized by
+    SQLite, and the indexes on time, topic and difficulty keep queries from
+    having to scan the whole history.
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH, legacy_csv_path=LEGACY_CSV_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS quiz_results (
+                id INTEGER PRIMARY KEY,
+                taken_at TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                score REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_quiz_results_taken_at ON quiz_results (taken_at);
+            CREATE INDEX IF NOT EXISTS idx_quiz_results_topic ON quiz_results (topic);
+            CREATE INDEX IF NOT EXISTS idx_quiz_results_difficulty ON quiz_results (difficulty);
+            CREATE TABLE IF NOT EXISTS store_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        for table, (key_column, _) in ROLLUP_TABLES.items():
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {key_column} TEXT PRIMARY KEY,
+                    attempts INTEGER NOT NULL,
+                    score_sum REAL NOT NULL,
+                    score_max REAL NOT NULL
+                )
+            """)
+        self._conn.commit()
+        self._ensure_rollups()
+
+        if legacy_csv_path:
+            self.import_csv(legacy_csv_path)
+
+    def import_csv(self, csv_path):
+        """One-time import of the old headerless quiz_results.csv; returns the rows imported"""
+        if not os.path.exists(csv_path):
+            return 0
+
+        with self._lock:
+            # BEGIN IMMEDIATE so two processes starting together cannot both import
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                marker = self._conn.execute(
+                    "SELECT value FROM store_meta WHERE key = 'csv_imported'"
+                ).fetchone()
+                if marker is not None:
+                    self._conn.rollback()
+                    return 0
+
+                rows = []
+                with open(csv_path, newline='') as file:
+                    for row in csv.reader(file):
+                        if len(row) != 4:
+                            continue
+                        taken_at, topic, difficulty, score = row
+                        try:
+                            rows.append((taken_at, topic, difficulty, float(score.strip().rstrip('%'))))
+                        except ValueError:
+                            continue
+
+                self._conn.executemany(
+                    "INSERT INTO quiz_results (taken_at, topic, difficulty, score) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._update_rollups(rows)
+                self._conn.execute(
+                    "INSERT INTO store_meta (key, value) VALUES ('csv_imported', ?)",
+                    (datetime.now().strftime(TIMESTAMP_FORMAT),),
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return len(rows)
+
+    def record_result(self, topic, difficulty, score, taken_at=None):
+        """Save one quiz result (score is a percentage)"""
+        self.record_results([(topic, difficulty, score, taken_at)])
+
+    def record_results(self, results):
+        """Save many (topic, difficulty, score, taken_at) results in a single transaction"""
+        now = datetime.now()
+        rows = [((taken_at or now).strftime(TIMESTAMP_FORMAT), topic, difficulty, float(score))
+                for topic, difficulty, score, taken_at in results]
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT INTO quiz_results (taken_at, topic, difficulty, score) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._update_rollups(rows)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def _update_rollups(self, rows):
+        # Runs inside the caller's transaction so raw rows and rollups never disagree
+        for table, (key_column, source_index) in ROLLUP_TABLES.items():
+            key_sql = WEEK_START_SQL.format("?") if table == "rollup_week" else "?"
+            self._conn.executemany(f"""
+                INSERT INTO {table} ({key_column}, attempts, score_sum, score_max)
+                VALUES ({key_sql}, 1, ?, ?)
+                ON CONFLICT ({key_column}) DO UPDATE SET
+                    attempts = attempts + 1,
+                    score_sum = score_sum + excluded.score_sum,
+                    score_max = MAX(score_max, excluded.score_max)
+            """, [(row[source_index], row[3], row[3]) for row in rows])
+
+    def _ensure_rollups(self):
+        # Databases created before the rollups existed are backfilled once from the raw rows
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                marker = self._conn.execute(
+                    "SELECT value FROM store_meta WHERE key = 'rollups_built'"
+                ).fetchone()
+                if marker is None:
+                    self._rebuild_rollups()
+                    self._conn.execute(
+                        "INSERT INTO store_meta (key, value) VALUES ('rollups_built', ?)",
+                        (datetime.now().strftime(TIMESTAMP_FORMAT),),
+                    )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def _rebuild_rollups(self):
+        for table, (key_column, _) in ROLLUP_TABLES.items():
+            source = WEEK_START_SQL.format("taken_at") if table == "rollup_week" else key_column
+            self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute(f"""
+                INSERT INTO {table} ({key_column}, attempts, score_sum, score_max)
+                SELECT {source}, COUNT(*), SUM(score), MAX(score)
+                FROM quiz_results GROUP BY {source}
+            """)
+
+    def load_results(self):
+        """All results as a DataFrame with DateTime, Topic, Difficulty and Score columns"""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT taken_at AS DateTime, topic AS Topic, difficulty AS Difficulty, score AS Score "
+                "FROM quiz_results ORDER BY id",
+                self._conn,
+            )
+        df["DateTime"] = pd.to_datetime(df["DateTime"], format=TIMESTAMP_FORMAT)
+        return df
+
+    def recent_results(self, limit=500):
+        """The most recent results, newest first, in the same shape as load_results"""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT taken_at AS DateTime, topic AS Topic, difficulty AS Difficulty, score AS Score "
+                "FROM quiz_results ORDER BY taken_at DESC LIMIT ?",
+                self._conn,
+                params=(limit,),
+            )
+        df["DateTime"] = pd.to_datetime(df["DateTime"], format=TIMESTAMP_FORMAT)
+        return df
+
+    def _read_rollup(self, table, key_column, label):
+        with self._lock:
+            return pd.read_sql_query(
+                f"SELECT {key_column} AS {label}, attempts AS Attempts, "
+                f"score_sum / attempts AS AverageScore, score_max AS BestScore "
+                f"FROM {table} ORDER BY {key_column}",
+                self._conn,
+            )
+
+    def weekly_rollup(self):
+        """Attempts, average and best score per week (Week is the Monday it starts on)"""
+        df = self._read_rollup("rollup_week", "week_start", "Week")
+        df["Week"] = pd.to_datetime(df["Week"])
+        return df
+
+    def topic_rollup(self):
+        """Attempts, average and best score per topic"""
+        return self._read_rollup("rollup_topic", "topic", "Topic")
+
+    def difficulty_rollup(self):
+        """Attempts, average and best score per difficulty level"""
+        return self._read_rollup("rollup_difficulty", "difficulty", "Difficulty")
+
+    def summary(self):
+        """Total quizzes, average score and best score across all results"""
+        with self._lock:
+            total, score_sum, best = self._conn.execute(
+                "SELECT SUM(attempts), SUM(score_sum), MAX(score_max) FROM rollup_difficulty"
+            ).fetchone()
+        if not total:
+            return {"total": 0, "average": 0.0, "best": 0.0}
+        return {"total": total, "average": score_sum / total, "best": best}
+
+    def latest_id(self):
+        """Id of the most recent result (0 if there are none); changes whenever data is added"""
+        with self._lock:
+            (latest,) = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM quiz_results").fetchone()
+        return latest
+
+    def results_since(self, last_id, until_id):
+        """Results with an id greater than last_id and at most until_id, oldest first, including the id column"""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT id, taken_at AS DateTime, topic AS Topic, difficulty AS Difficulty, score AS Score "
+                "FROM quiz_results WHERE id > ? AND id <= ? ORDER BY id",
+                self._conn,
+                params=(last_id, until_id),
+            )
+        df["DateTime"] = pd.to_datetime(df["DateTime"], format=TIMESTAMP_FORMAT)
+        return df
+
+
+def partition_name(learner_id):
+    """File-system safe, collision free name of a learner's partition"""
+    slug = re.sub(r"[^a-z0-9_-]+", "_", learner_id.lower()).strip("_")[:40]
+    digest = hashlib.sha1(learner_id.encode("utf-8")).hexdigest()[:10]
+    return f"{slug}-{digest}"
+
+
+class LearnerPartitions:
+    """Quiz results partitioned into one ResultsStore (SQLite file) per learner.
+
+    A learner's dashboard only touches their own history, and submissions from
+    different learners write to different files so they never contend for the
+    same database lock. The legacy learner keeps the original database (and the
+    one-time CSV import).
+    """
+
+    def __init__(self, directory=RESULTS_DIR, max_open=MAX_OPEN_PARTITIONS):
+        self.directory = directory
+        self.max_open = max_open
+        self._lock = threading.Lock()
+        self._stores = OrderedDict()
+
+    def path_for(self, learner_id):
+        """Database file holding the learner's results"""
+        if learner_id == LEGACY_LEARNER_ID:
+            return RESULTS_DB_PATH
+        return os.path.join(self.directory, f"{partition_name(learner_id)}.db")
+
+    def exists(self, learner_id):
+        """Whether the learner has any stored results (without creating a partition)"""
+        if learner_id == LEGACY_LEARNER_ID and os.path.exists(LEGACY_CSV_PATH):
+            return True
+        return os.path.exists(self.path_for(learner_id))
+
+    def store_for(self, learner_id):
+        """The learner's ResultsStore, opening (and creating) it if needed"""
+        with self._lock:
+            store = self._stores.pop(learner_id, None)
+            if store is None:
+                legacy_csv_path = LEGACY_CSV_PATH if learner_id == LEGACY_LEARNER_ID else None
+                store = ResultsStore(self.path_for(learner_id), legacy_csv_path=legacy_csv_path)
+            self._stores[learner_id] = store
+
+            # Keep only the most recently used partitions open; evicted connections
+            # are closed once no session holds on to them any more.
+            while len(self._stores) > self.max_open:
+                self._stores.popitem(last=False)
+            return store
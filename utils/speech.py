@@ -0,0 +1,167 @@
+"""Server-side speech recognition for audio recorded in the browser.
+
+The voice pages capture speech with st.audio_input, so nothing here touches a
+sound device. Silence is trimmed from the uploaded recording and it is split
+at pauses (utils.vad); the voiced segments are recognised concurrently on a
+worker pool shared by every session, and their transcripts are joined in order.
+
+The recognizer is pluggable (SPEECH_RECOGNIZER):
+    google          Google's web speech API (default, needs network access)
+    vosk            offline Kaldi model on the CPU (pip install vosk, set VOSK_MODEL_PATH)
+    faster_whisper  offline Whisper model on the CPU (pip install faster-whisper)
+Offline models are loaded once per process and shared by every session.
+"""
+import functools
+import io
+import json
+import logging
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import speech_recognition as sr
+
+from utils.metrics import SPEECH_AUDIO_SECONDS, SPEECH_RECOGNITION_SECONDS, SPEECH_VOICED_SECONDS
+from utils.vad import voiced_audio
+
+logger = logging.getLogger(__name__)
+
+# Recognition settings (override via .env)
+SPEECH_RECOGNIZER = os.getenv("SPEECH_RECOGNIZER", "google").lower()
+RECOGNITION_LANGUAGE = os.getenv("SPEECH_LANGUAGE", "en-US")
+RECOGNITION_WORKERS = int(os.getenv("SPEECH_RECOGNITION_WORKERS", "8"))
+CHUNK_SECONDS = float(os.getenv("SPEECH_CHUNK_SECONDS", "15"))
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", os.path.join("models", "vosk-model-small-en-us-0.15"))
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base.en")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+
+# Offline models expect 16 kHz, 16-bit mono audio
+MODEL_SAMPLE_RATE = 16000
+
+# Shared by every session so simultaneous speakers cannot spawn unbounded threads
+_recognition_executor = ThreadPoolExecutor(max_workers=RECOGNITION_WORKERS, thread_name_prefix="speech")
+
+Transcript = namedtuple("Transcript", ["text", "recognizer", "seconds", "audio_seconds"])
+
+
+class GoogleRecognizer:
+    """Google's free web speech API, one request per chunk"""
+
+    name = "google"
+
+    def recognize(self, audio, language):
+        try:
+            return sr.Recognizer().recognize_google(audio, language=language)
+        except sr.UnknownValueError:
+            return ""
+
+
+class VoskRecognizer:
+    """Offline Kaldi recognizer; the model is shared, a decoder is created per chunk"""
+
+    name = "vosk"
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        import vosk
+
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def recognize(self, audio, language):
+        decoder = self._vosk.KaldiRecognizer(self.model, MODEL_SAMPLE_RATE)
+        decoder.AcceptWaveform(audio.get_raw_data(convert_rate=MODEL_SAMPLE_RATE, convert_width=2))
+        return json.loads(decoder.FinalResult()).get("text", "")
+
+
+class WhisperRecognizer:
+    """Offline Whisper model running on the CPU through CTranslate2"""
+
+    name = "faster_whisper"
+
+    def __init__(self, model_name=WHISPER_MODEL, compute_type=WHISPER_COMPUTE_TYPE):
+        import numpy as np
+        from faster_whisper import WhisperModel
+
+        self._np = np
+        self.model = WhisperModel(model_name, device="cpu", compute_type=compute_type,
+                                  num_workers=RECOGNITION_WORKERS)
+
+    def recognize(self, audio, language):
+        raw = audio.get_raw_data(convert_rate=MODEL_SAMPLE_RATE, convert_width=2)
+        samples = self._np.frombuffer(raw, dtype=self._np.int16).astype(self._np.float32) / 32768.0
+        segments, _ = self.model.transcribe(samples, language=language.split("-")[0], beam_size=1)
+        return " ".join(segment.text.strip() for segment in segments)
+
+
+RECOGNIZERS = {
+    "google": GoogleRecognizer,
+    "vosk": VoskRecognizer,
+    "faster_whisper": WhisperRecognizer,
+}
+
+
+class RecognizerUnavailable:
+    """Cached in place of a backend that failed to load, so the load is not retried on every utterance"""
+
+    def __init__(self, reason):
+        self.reason = reason
+
+
+@functools.lru_cache(maxsize=None)
+def _load_recognizer(name):
+    if name not in RECOGNIZERS:
+        return RecognizerUnavailable(f"unknown speech recognizer {name!r}")
+    try:
+        return RECOGNIZERS[name]()
+    except Exception as e:
+        logger.exception("Loading the %s speech recognizer failed", name)
+        return RecognizerUnavailable(f"{name} recognizer unavailable: {e}")
+
+
+def get_recognizer(name=SPEECH_RECOGNIZER):
+    """Process-wide recognizer, so offline models are loaded only once.
+
+    Raises sr.RequestError if the backend is unknown or cannot be loaded
+    (missing package or model files); the failure is logged once and then
+    reported again without another load attempt.
+    """
+    recognizer = _load_recognizer(name)
+    if isinstance(recognizer, RecognizerUnavailable):
+        raise sr.RequestError(recognizer.reason)
+    return recognizer
+
+
+def load_recording(data):
+    """Decode an uploaded WAV/AIFF/FLAC recording into AudioData"""
+    with sr.AudioFile(io.BytesIO(data)) as source:
+        return sr.Recognizer().record(source)
+
+
+def audio_seconds(audio):
+    return len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+
+
+def transcribe(data, language=RECOGNITION_LANGUAGE, chunk_seconds=CHUNK_SECONDS, recognizer=None):
+    """Transcribe a recording, recognising its voiced segments in parallel off the calling thread.
+
+    Returns a Transcript with the text and how long recognition took.
+    Raises sr.UnknownValueError when no speech was recognised and
+    sr.RequestError when the recognizer could not be reached or loaded.
+    """
+    recognizer = recognizer or get_recognizer()
+    started = time.perf_counter()
+    audio = load_recording(data)
+    # Only the voiced parts are sent, cut at pauses rather than mid-word
+    segments = voiced_audio(audio, max_segment_ms=int(chunk_seconds * 1000))
+    futures = [_recognition_executor.submit(recognizer.recognize, segment, language) for segment in segments]
+    text = " ".join(part for part in (future.result() for future in futures) if part)
+    elapsed = time.perf_counter() - started
+
+    SPEECH_RECOGNITION_SECONDS.observe(elapsed, recognizer=recognizer.name)
+    SPEECH_AUDIO_SECONDS.inc(audio_seconds(audio), recognizer=recognizer.name)
+    SPEECH_VOICED_SECONDS.inc(sum(audio_seconds(segment) for segment in segments), recognizer=recognizer.name)
+    if not text:
+        raise sr.UnknownValueError()
+    return Transcript(text, recognizer.name, elapsed, audio_seconds(audio))
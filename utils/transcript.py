@@ -0,0 +1,53 @@
+"""Windowed rendering of the voice pages' chat transcripts.
+
+Only the most recent TRANSCRIPT_WINDOW messages are rendered on a rerun; a
+button pages older ones back in on demand. Each message's HTML is built once
+per process and reused, so a rerun only pays for messages it has not seen.
+"""
+import functools
+import os
+
+import streamlit as st
+
+# Messages shown before older ones are paged in, and rendered messages kept (override via .env)
+TRANSCRIPT_WINDOW = int(os.getenv("TRANSCRIPT_WINDOW", "20"))
+RENDER_CACHE_SIZE = int(os.getenv("TRANSCRIPT_RENDER_CACHE_SIZE", "4096"))
+
+ANALYSIS_HEADINGS = ("Grammar Analysis :", "Sentence Formation :", "Score :", "Suggestions :")
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def chat_bubble_html(content):
+    """One chatbot message as a bubble in the chat container"""
+    return f"<div class='stChatMessage'>{content}</div>"
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def grammar_analysis_html(content):
+    """A grammar analysis reply as a single response card, with its section headings highlighted"""
+    lines = []
+    for line in content.split("\n"):
+        css_class = "metric-heading" if line.startswith(ANALYSIS_HEADINGS) else "metric-content"
+        lines.append(f"<div class='{css_class}'>{line}</div>")
+    return f"<div class='response-card'><h4>AI Response:</h4>{''.join(lines)}</div>"
+
+
+def _show_older(shown_key, window):
+    st.session_state[shown_key] = st.session_state.get(shown_key, window) + window
+
+
+def visible_messages(messages, key, window=TRANSCRIPT_WINDOW):
+    """The most recent messages to render, after a button that pages in older ones when any are hidden"""
+    shown_key = f"{key}_shown"
+    shown = st.session_state.get(shown_key, window)
+    hidden = len(messages) - shown
+    if hidden > 0:
+        st.button(f"⬆️ Show older messages ({hidden} hidden)", key=f"{key}_older",
+                  on_click=_show_older, args=(shown_key, window))
+        return messages[hidden:]
+    return messages
+
+
+def reset_window(key):
+    """Go back to showing only the most recent messages (e.g. after the chat is cleared)"""
+    st.session_state.pop(f"{key}_shown", None)
@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+
+from gtts import gTTS
+
+from utils.content_cache import make_cache_key
+from utils.metrics import TTS_SYNTHESIS_SECONDS, record_cache_lookup
+
+# Location, quota and voice of the shared speech cache (override via .env)
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(".cache", "tts"))
+TTS_CACHE_MAX_BYTES = int(float(os.getenv("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024)
+TTS_LANGUAGE = os.getenv("TTS_LANGUAGE", "en")
+TTS_TLD = os.getenv("TTS_TLD", "com")
+TTS_SLOW = os.getenv("TTS_SLOW", "0") == "1"
+
+
+class TTSCache:
+    """Content-addressed cache of synthesised speech on disk.
+
+    Each clip is stored as <sha256 of text and voice settings>.mp3, so identical
+    replies are synthesised once and then played from disk by every session and
+    worker process. Once the directory grows past ``max_bytes`` the least
+    recently played clips are deleted.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self):
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith(".mp3")]
+
+    def path_for(self, text, lang=TTS_LANGUAGE, tld=TTS_TLD, slow=TTS_SLOW):
+        key = make_cache_key("tts", text, lang, tld, slow)
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def synthesize(self, text, lang=TTS_LANGUAGE, tld=TTS_TLD, slow=TTS_SLOW):
+        """Path of an MP3 of text, synthesised with gTTS only if it is not cached yet"""
+        path = self.path_for(text, lang, tld, slow)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(path, threading.Lock())
+
+        # Concurrent requests for the same clip wait for one synthesis instead of repeating it
+        with key_lock:
+            hit = os.path.exists(path)
+            record_cache_lookup("tts", "tts_cache", hit)
+            if hit:
+                # The modification time doubles as the last-played time for LRU eviction
+                os.utime(path)
+            else:
+                started = time.perf_counter()
+                temp_path = f"{path}.{threading.get_ident()}.tmp"
+                try:
+                    gTTS(text=text, lang=lang, tld=tld, slow=slow).save(temp_path)
+                    os.replace(temp_path, path)
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                TTS_SYNTHESIS_SECONDS.observe(time.perf_counter() - started)
+
+        with self._lock:
+            self._key_locks.pop(path, None)
+            if not hit:
+                self._size += os.path.getsize(path)
+                if self.max_bytes and self._size > self.max_bytes:
+                    self._evict(keep=path)
+        return path
+
+    def _evict(self, keep):
+        # Rescan rather than trust the running total, since other processes share the directory
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        self._size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if self._size <= self.max_bytes:
+                break
+            if entry.path == keep:
+                continue
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._size -= size
+            except FileNotFoundError:
+                continue
@@ -0,0 +1,145 @@
+"""Sentence-pipelined speech for streamed replies.
+
+As reply text streams in, every completed sentence is handed to a shared
+synthesis pool straight away, and finished clips are queued, in order, on a
+player that lives in the parent page. The learner hears the first sentence
+while the model is still writing (and the pool still synthesising) the rest.
+"""
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit.components.v1 as components
+from streamlit import config, runtime
+
+logger = logging.getLogger(__name__)
+
+# Pipeline settings (override via .env)
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "4"))
+MIN_SENTENCE_CHARS = int(os.getenv("TTS_MIN_SENTENCE_CHARS", "20"))
+
+# Shared by every session so simultaneous replies cannot spawn unbounded threads
+_tts_executor = ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix="tts")
+
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+
+
+def split_sentences(text, min_chars=MIN_SENTENCE_CHARS):
+    """Split text into (complete sentences, unfinished remainder).
+
+    Sentences shorter than min_chars are joined to the next one, so a reply
+    opening with "Sure!" is not synthesised as a clip of its own.
+    """
+    sentences = []
+    pending = ""
+    position = 0
+    for match in SENTENCE_END.finditer(text):
+        pending += text[position:match.end()]
+        position = match.end()
+        if len(pending.strip()) >= min_chars:
+            sentences.append(pending.strip())
+            pending = ""
+    return sentences, pending + text[position:]
+
+
+class SentenceSpeaker:
+    """Turns streamed text into an ordered series of synthesised clips.
+
+    feed() each chunk of text as it arrives; it returns the clips that are
+    ready to play, in reply order, without waiting on the rest. finish()
+    synthesises the final sentence and yields the remaining clips as each one
+    completes. paths holds every clip of the reply once finished.
+    """
+
+    def __init__(self, synthesize):
+        self.synthesize = synthesize
+        self.paths = []
+        self.failures = 0
+        self._buffer = ""
+        self._pending = []
+
+    def feed(self, text):
+        self._buffer += text
+        sentences, self._buffer = split_sentences(self._buffer)
+        for sentence in sentences:
+            self._pending.append(_tts_executor.submit(self.synthesize, sentence))
+        return list(self._collect(wait=False))
+
+    def finish(self):
+        if self._buffer.strip():
+            self._pending.append(_tts_executor.submit(self.synthesize, self._buffer.strip()))
+            self._buffer = ""
+        yield from self._collect(wait=True)
+
+    def _collect(self, wait):
+        while self._pending and (wait or self._pending[0].done()):
+            future = self._pending.pop(0)
+            try:
+                path = future.result()
+            except Exception:
+                # A clip that failed to synthesise is skipped; the text is still shown
+                logger.exception("Synthesising a reply sentence failed")
+                self.failures += 1
+                continue
+            self.paths.append(path)
+            yield path
+
+
+# Installed once into the parent page so playback survives the reruns that remove the component iframes
+PLAYER_SCRIPT = """
+window.__replyPlayer = window.__replyPlayer || (function () {
+    const player = {reply: null, clips: [], current: null};
+    function playNext() {
+        player.current = player.clips.shift() || null;
+        if (player.current) {
+            player.current.play().catch(playNext);
+        }
+    }
+    player.enqueue = function (reply, src) {
+        if (player.reply !== reply) {
+            // A new reply interrupts whatever is still playing from the previous one
+            if (player.current) player.current.pause();
+            player.reply = reply;
+            player.clips = [];
+            player.current = null;
+        }
+        const clip = new Audio(src);
+        clip.preload = "auto";
+        clip.addEventListener("ended", playNext);
+        player.clips.push(clip);
+        if (!player.current) playNext();
+    };
+    return player;
+})();
+"""
+
+
+def audio_url(path):
+    """URL of an MP3 clip in Streamlit's media storage.
+
+    Only the URL goes over the websocket; the browser fetches the bytes once
+    (with range requests) and revalidates them by ETag on replay. Storage keys
+    files by content hash, so a clip is held once however many sessions play it.
+    A clip stays served while it is registered again on each rerun.
+    """
+    url = runtime.get_instance().media_file_mgr.add(path, "audio/mpeg", f"tts.{os.path.basename(path)}")
+    # The player lives in the parent page, so the URL has to carry any base path the app is served under
+    base_path = config.get_option("server.baseUrlPath").strip("/")
+    return f"/{base_path}{url}" if base_path else url
+
+
+def queue_audio(reply_id, src):
+    """Append a clip to the parent page's player; clips of the same reply play back to back"""
+    components.html(f"""
+        <script>
+        const page = window.parent;
+        if (!page.__replyPlayer) {{
+            const script = page.document.createElement("script");
+            script.textContent = {json.dumps(PLAYER_SCRIPT)};
+            page.document.head.appendChild(script);
+        }}
+        page.__replyPlayer.enqueue({json.dumps(reply_id)}, {json.dumps(src)});
+        </script>
+    """, height=0)
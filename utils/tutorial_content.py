@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+
+# Pre-generated tutorial content written by `python -m utils.precompute_tutorials`
+BUNDLE_PATH = os.getenv("TUTORIAL_BUNDLE_PATH", os.path.join("content", "tutorial_bundle.json"))
+
+# Define grammar topics from your list
+GRAMMAR_TOPICS = {
+    "Basic Concepts": [
+        "Word definition criteria",
+        "Sentence: Definition & Types",
+        "Parts of Speech Overview"
+    ],
+    "Parts of Speech": [
+        "Noun: Definition & types",
+        "Pronoun: Definition & Types",
+        "Adjective: Definition & Types",
+        "Verb: Definition & Types",
+        "Adverb: Definition & Types",
+        "Preposition: definition & Types",
+        "Conjunction: Definition & Types",
+        "Interjection: Definition & Types",
+        "Article: Definition & Types"
+    ],
+    "Tenses": [
+        "Present Tense: Definition & Structure",
+        "Past Tense: Definition & Structure",
+        "Future Tense: Definition & Structure",
+        "Present Simple (Indefinite) Tense",
+        "Present Progressive (Continuous) Tense",
+        "Present Perfect Tense",
+        "Present Perfect Progressive Tense",
+        "Past Simple Tense",
+        "Past Progressive Tense",
+        "Past Perfect Tense",
+        "Future Simple Tense",
+        "Future Progressive Tense",
+        "Future Perfect Tense"
+    ],
+    "Advanced Grammar": [
+        "Clauses: Definition and Types",
+        "Conditionals: Definition and Types",
+        "Modal Auxiliaries",
+        "Subject Verb Agreement: Rules",
+        "Transformation of sentences",
+        "Punctuation: Definition, Types & Usage Rules"
+    ]
+}
+
+DIFFICULTY_DESCRIPTIONS = {
+    "Easy": "Basic concepts and simple examples suitable for beginners",
+    "Medium": "More detailed explanations with varied examples for intermediate learners",
+    "Hard": "Advanced concepts, complex examples, and detailed technical explanations"
+}
+
+
+def explanation_prompt(topic, difficulty):
+    """Prompt for the main grammar explanation at the given difficulty level"""
+    difficulty_prompts = {
+        "Easy": f"""
+            Explain {topic} in simple terms for beginners.
+            Use basic vocabulary and simple examples.
+            
+            Include:
+            1. Simple Definition (3-4 sentences)
+            2. Basic Examples (3-4 easy examples)
+            3. Simple Practice Tips (3 tips)
+            4. Remember Points (3 key points)
+            
+            Keep it concise and beginner-friendly.
+        """,
+        "Medium": f"""
+            Provide a comprehensive explanation of {topic} for intermediate learners.
+            
+            Include:
+            1. Detailed Definition
+            2. Key Concepts (3-4 points)
+            3. Multiple Examples (4-5 varied examples)
+            4. Common Usage Patterns
+            5. Practice Tips (3-4 tips)
+            6. Common Mistakes to Avoid
+            
+            Use more detailed examples and explanations.
+        """,
+        "Hard": f"""
+            Provide an advanced, detailed analysis of {topic}.
+            
+            Include:
+            1. Comprehensive Technical Definition
+            2. Detailed Theoretical Background
+            3. Complex Concepts and Rules
+            4. Advanced Examples (including exceptions)
+            5. Technical Usage Notes
+            6. Common Errors in Advanced Usage
+            7. Expert Tips and Tricks
+            8. Related Advanced Topics
+            
+            Include complex cases and exceptions.
+        """
+    }
+    return difficulty_prompts[difficulty]
+
+
+def practice_prompt(topic, difficulty):
+    """Prompt for the practice questions study tool"""
+    return f"""
+                Generate {difficulty.lower()}-level practice questions about {topic}.
+                Start with 
+                Easy: Create 2 simple questions
+                Medium: Create 2 moderate questions
+                Hard: Create 2 complex questions
+                Include answers and explanations.
+                """
+
+
+def mistakes_prompt(topic, difficulty):
+    """Prompt for the common mistakes study tool"""
+    return f"""
+                List common mistakes people make when using {topic} at {difficulty.lower()} level.
+                As a Table 
+                Include:
+                1. The mistake
+                2. Why it's wrong
+                3. The correct usage
+                Adjust complexity based on the difficulty level selected.
+                """
+
+
+# Every kind of content stored per (topic, difficulty) in the bundle
+CONTENT_PROMPTS = {
+    "explanation": explanation_prompt,
+    "practice": practice_prompt,
+    "mistakes": mistakes_prompt,
+}
+
+
+def iter_catalogue():
+    """Yield every (topic, difficulty) pair of the tutorial catalogue"""
+    for topics in GRAMMAR_TOPICS.values():
+        for topic in topics:
+            for difficulty in DIFFICULTY_DESCRIPTIONS:
+                yield topic, difficulty
+
+
+def entry_key(topic, difficulty):
+    """Key of a (topic, difficulty) entry inside the bundle"""
+    return f"{difficulty}::{topic}"
+
+
+def prompt_fingerprint(topic, difficulty, model_name):
+    """Hash of the prompts (and model) used for an entry, to detect stale content"""
+    digest = hashlib.sha256(model_name.encode("utf-8"))
+    for kind, build_prompt in CONTENT_PROMPTS.items():
+        digest.update(kind.encode("utf-8"))
+        digest.update(build_prompt(topic, difficulty).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_bundle(path=BUNDLE_PATH):
+    """Load the pre-generated content bundle, or an empty one if it does not exist"""
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"version": 0, "entries": {}}
+
+
+def save_bundle(bundle, path=BUNDLE_PATH):
+    """Atomically write the content bundle so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(bundle, file, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def bundle_content(bundle, topic, difficulty, kind, model_name):
+    """Return pre-generated content for an entry if it is present and up to date"""
+    entry = bundle.get("entries", {}).get(entry_key(topic, difficulty))
+    if not entry or entry.get("prompt_hash") != prompt_fingerprint(topic, difficulty, model_name):
+        return None
+    return entry.get(kind)
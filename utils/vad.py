@@ -0,0 +1,99 @@
+"""Energy-based voice activity detection for recorded utterances.
+
+Frames whose loudness rises a margin above the recording's own noise floor
+count as speech. Short pauses inside speech are bridged, blips shorter than
+a syllable are ignored, and each speech region is padded slightly so word
+onsets are not clipped. The result is the list of voiced segments: leading
+and trailing silence is dropped and long pauses become segment boundaries.
+"""
+import os
+
+import numpy as np
+
+# Endpointing thresholds (override via .env)
+FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+MIN_ENERGY_DBFS = float(os.getenv("VAD_MIN_ENERGY_DBFS", "-50"))
+NOISE_MARGIN_DB = float(os.getenv("VAD_NOISE_MARGIN_DB", "12"))
+MIN_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", "500"))
+MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "150"))
+PADDING_MS = int(os.getenv("VAD_PADDING_MS", "200"))
+
+
+def frame_energies(audio, frame_ms=FRAME_MS):
+    """Loudness (dBFS) of each frame_ms frame of 16-bit audio"""
+    samples = np.frombuffer(audio.get_raw_data(convert_width=2), dtype=np.int16).astype(np.float32)
+    frame_length = max(1, int(audio.sample_rate * frame_ms / 1000))
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return np.empty(0)
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length) / 32768.0
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def speech_threshold(energies, min_energy_dbfs=MIN_ENERGY_DBFS, noise_margin_db=NOISE_MARGIN_DB):
+    # The quietest tenth of the recording is taken as its background noise
+    noise_floor = np.percentile(energies, 10)
+    threshold = noise_floor + noise_margin_db
+    if energies.max() - noise_floor > noise_margin_db:
+        # Capped below the loudest frame so a clip that is speech from end to end is not classed
+        # as all noise; a clip whose level barely varies (steady background noise) gets no cap
+        threshold = min(threshold, energies.max() - noise_margin_db)
+    return max(min_energy_dbfs, threshold)
+
+
+def split_at_pauses(start_ms, end_ms, energies, max_segment_ms, frame_ms=FRAME_MS):
+    """Split a voiced region into pieces of at most max_segment_ms, each cut at its quietest frame"""
+    pieces = []
+    while end_ms - start_ms > max_segment_ms:
+        # The quietest frame in the second half of the allowed length, so words are not cut in half
+        first = (start_ms + max_segment_ms // 2) // frame_ms
+        last = max(first + 1, (start_ms + max_segment_ms) // frame_ms)
+        cut = max(start_ms + frame_ms, (first + int(np.argmin(energies[first:last]))) * frame_ms)
+        pieces.append((start_ms, cut))
+        start_ms = cut
+    pieces.append((start_ms, end_ms))
+    return pieces
+
+
+def speech_segments(audio, max_segment_ms=None, frame_ms=FRAME_MS, min_silence_ms=MIN_SILENCE_MS,
+                    min_speech_ms=MIN_SPEECH_MS, padding_ms=PADDING_MS):
+    """(start_ms, end_ms) of each voiced region, split at pauses so none is longer than max_segment_ms"""
+    energies = frame_energies(audio, frame_ms)
+    if len(energies) == 0:
+        return []
+    voiced = energies > speech_threshold(energies)
+
+    regions = []
+    start = None
+    for index, is_voiced in enumerate(np.append(voiced, False)):
+        if is_voiced and start is None:
+            start = index
+        elif not is_voiced and start is not None:
+            if regions and (start - regions[-1][1]) * frame_ms < min_silence_ms:
+                regions[-1][1] = index
+            else:
+                regions.append([start, index])
+            start = None
+
+    duration_ms = len(energies) * frame_ms
+    segments = []
+    for start, end in regions:
+        if (end - start) * frame_ms < min_speech_ms:
+            continue
+        start_ms = max(0, start * frame_ms - padding_ms)
+        end_ms = min(duration_ms, end * frame_ms + padding_ms)
+        if segments and start_ms <= segments[-1][1]:
+            segments[-1] = (segments[-1][0], end_ms)
+        else:
+            segments.append((start_ms, end_ms))
+
+    if max_segment_ms:
+        segments = [piece for start_ms, end_ms in segments
+                    for piece in split_at_pauses(start_ms, end_ms, energies, max_segment_ms, frame_ms)]
+    return segments
+
+
+def voiced_audio(audio, **kwargs):
+    """AudioData segments holding just the speech in audio (empty when nothing was said)"""
+    return [audio.get_segment(start_ms, end_ms) for start_ms, end_ms in speech_segments(audio, **kwargs)]